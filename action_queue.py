@@ -0,0 +1,140 @@
+# action_queue.py
+
+# --- Pointer Action Queue ---
+# The keyboard hook callback runs on the `keyboard` library's processing thread;
+# anything slow there delays every later keystroke (and Windows silently removes
+# low-level hooks that exceed LowLevelHooksTimeout). The hook therefore only
+# pushes compact action records onto a bounded queue, and one executor thread
+# performs them in order.
+#
+# Relative actions produced at a fixed rate (Free Mode moves and scrolls) go
+# through submit_delta(): deltas add up while one action of that kind waits, so
+# a slow pointer backend (pyautogui sleeps after every call) gets fewer, larger
+# moves instead of a backlog that keeps moving the pointer after the key is
+# released and crowds clicks out of the queue.
+import queue
+import threading
+import time
+
+_PENDING_DELTAS = object() # Marks a queued submit_delta() action; its arguments are taken when it runs
+
+class ActionExecutor:
+    """
+    Runs actions submitted from any thread on a dedicated worker thread, in order.
+
+    handlers -- action kind -> callable(*args), executed on the worker thread
+    maxsize  -- queue bound; submissions beyond it are dropped (and counted)
+    """
+
+    def __init__(self, handlers, maxsize=64):
+        self.handlers = handlers
+        self._queue = queue.Queue(maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.merged = 0 # submit_delta() calls folded into an action already waiting
+        self._pending_deltas = {} # kind -> summed deltas of the waiting submit_delta() action
+        self.total_latency = 0.0 # Seconds from submit() to completion, summed
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._thread = threading.Thread(target=self._run, name="ActionExecutor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Finishes the queued actions (up to `timeout`) and ends the worker thread."""
+        if not self._thread: return
+        try: self._queue.put((None, (), 0.0), timeout=timeout)
+        except queue.Full: pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, kind, *args):
+        """Queues an action without blocking. Returns False if the queue was full."""
+        try:
+            self._queue.put_nowait((kind, args, time.perf_counter()))
+            return True
+        except queue.Full:
+            with self._lock: self.dropped += 1
+            return False
+
+    def submit_delta(self, kind, *deltas):
+        """
+        Adds `deltas` (e.g. a move's dx, dy) to the waiting action of `kind`, or queues
+        one. Runs `kind`'s handler with the sums collected until the executor gets to it.
+        """
+        with self._lock:
+            pending = self._pending_deltas.get(kind)
+            if pending is not None:
+                self._pending_deltas[kind] = tuple(a + b for a, b in zip(pending, deltas))
+                self.merged += 1
+                return True
+            self._pending_deltas[kind] = deltas
+        if self.submit(kind, _PENDING_DELTAS): return True
+        with self._lock: self._pending_deltas.pop(kind, None)
+        return False
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "executed": self.executed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "merged": self.merged,
+                "avg_latency_ms": self.total_latency / self.executed * 1000 if self.executed else 0.0,
+                "max_latency_ms": self.max_latency * 1000,
+                "last_latency_ms": self.last_latency * 1000,
+            }
+
+    def _run(self):
+        while True:
+            kind, args, submitted_at = self._queue.get()
+            if kind is None: return
+            if args and args[0] is _PENDING_DELTAS:
+                with self._lock: args = self._pending_deltas.pop(kind)
+            try:
+                self.handlers[kind](*args)
+            except Exception as e:
+                with self._lock: self.failed += 1
+                print(f"ERROR: Pointer action '{kind}' failed: {e}")
+            latency = time.perf_counter() - submitted_at
+            with self._lock:
+                self.executed += 1
+                self.total_latency += latency
+                self.last_latency = latency
+                if latency > self.max_latency: self.max_latency = latency
+
+
+def format_stats(stats):
+    return (f"depth {stats['depth']}, executed {stats['executed']}, dropped {stats['dropped']}, failed {stats['failed']}, merged {stats['merged']}, "
+            f"latency avg {stats['avg_latency_ms']:.2f} ms / max {stats['max_latency_ms']:.2f} ms / last {stats['last_latency_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    # Free Mode against a slow pointer backend: every move takes 0.1 s, as with pyautogui's
+    # PAUSE. Holds a direction for 1 s at 120 Hz, then releases and clicks.
+    from free_mode_motion import MotionEngine
+
+    pointer_x, moves = [0], []
+    def slow_move(dx, dy):
+        time.sleep(0.1); pointer_x[0] += dx; moves.append(time.perf_counter())
+    executor = ActionExecutor({"move": slow_move, "click": lambda: None}, maxsize=64)
+    executor.start()
+    engine = MotionEngine(lambda dx, dy: executor.submit_delta("move", dx, dy))
+    engine.start()
+    engine.press((1, 0)); time.sleep(1.0)
+    engine.release_all(); released_at = time.perf_counter()
+    click_accepted = executor.submit("click")
+    depth_at_release = executor.depth()
+    executor.stop(timeout=10.0); engine.stop()
+    print(f"{len(moves)} moves executed, {pointer_x[0]} px, queue depth at release {depth_at_release}, "
+          f"click accepted: {click_accepted}")
+    print(f"Pointer kept moving {max(0.0, moves[-1] - released_at):.2f} s after release; {format_stats(executor.stats())}")
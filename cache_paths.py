@@ -0,0 +1,28 @@
+# cache_paths.py
+
+# --- Per-user cache location ---
+# Derived artifacts (pre-rendered overlays, etc.) live in the platform's user
+# cache directory so they survive restarts but can be deleted at any time.
+import os
+import sys
+
+APP_CACHE_NAME = "mouseless"
+
+def get_cache_dir(subdir=None):
+    """
+    Returns (and creates if needed) the mouseless cache directory:
+    - Windows: %LOCALAPPDATA%\\mouseless\\Cache
+    - macOS:   ~/Library/Caches/mouseless
+    - Others:  $XDG_CACHE_HOME/mouseless (default ~/.cache/mouseless)
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        path = os.path.join(base, APP_CACHE_NAME, "Cache")
+    elif sys.platform == "darwin":
+        path = os.path.join(os.path.expanduser("~/Library/Caches"), APP_CACHE_NAME)
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        path = os.path.join(base, APP_CACHE_NAME)
+    if subdir: path = os.path.join(path, subdir)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,217 @@
+# control_channel.py
+
+# --- Single Instance and Control Channel ---
+# Only one Mouseless runs per user: a second one would hook the keyboard twice.
+# The running instance listens on a local channel, and a later launch forwards
+# its command line there and exits instead of starting up:
+#   main_script.py show | hide | toggle | free-mode [on|off] | click AB/K [right] |
+#                  reload-config | stats | status | quit | help
+# `python control_channel.py <command>` does the same with only the standard
+# library imported (no Tk, hooks or layouts), which is what scripts and hotkey
+# daemons should call.
+#
+# Channel: a Unix domain socket in an owner-only (0700) directory under the user
+# cache directory, or the named pipe \\.\pipe\mouseless-<user> on Windows, which
+# by default only its owner (and administrators) can write to. Whoever can
+# connect can click, so nothing else is exposed. A request is one frame in
+# multiprocessing.connection's framing (4-byte big-endian length, then the
+# data) holding the command words, UTF-8, joined by newlines; the reply frame is
+# "ok" or "error", a newline and the reply text. Nothing is unpickled.
+#
+# On POSIX an flock()ed lock file marks the instance from its first moment, so a
+# launch during another's start-up waits for that one instead of starting too.
+import os
+import struct
+import sys
+import threading
+import time
+
+from cache_paths import get_cache_dir
+
+CONTROL_SUBDIR = "control"
+PIPE_PREFIX = "\\\\.\\pipe\\mouseless-"
+CONNECT_TIMEOUT = 3.0 # Seconds a command waits for an instance that is still starting up
+REPLY_TIMEOUT = 10.0 # Seconds a command waits for its reply (the instance may still be compiling layouts)
+MAX_REQUEST_BYTES = 64 * 1024
+
+class NoInstanceError(ConnectionError):
+    """No running instance answers on the control channel."""
+
+def control_address():
+    """Socket path (POSIX) or pipe name (Windows) of this user's instance."""
+    if sys.platform == "win32": return PIPE_PREFIX + os.environ.get("USERNAME", "user")
+    directory = get_cache_dir(CONTROL_SUBDIR)
+    os.chmod(directory, 0o700) # Owner only: see above
+    return os.path.join(directory, "mouseless.sock")
+
+
+class ControlServer:
+    """
+    The running instance's end. claim() makes this process the instance (or
+    reports that another one is); serve() then answers commands on a daemon thread.
+
+    commands -- {name: (handler, usage, description)}; handler(*args) runs on the
+                channel's thread, returns the reply text and raises ValueError for
+                invalid arguments
+    """
+
+    def __init__(self):
+        self.address = None
+        self.listener = None
+        self.commands = {}
+        self.served = 0
+        self._lock_file = None
+        self._thread = None
+        self._stopping = False
+
+    def claim(self):
+        """True if this process is now the instance and listening; False if another instance is."""
+        from multiprocessing.connection import Listener
+        self.address = control_address()
+        if sys.platform == "win32":
+            try:
+                self.listener = Listener(self.address, family="AF_PIPE") # Created with FILE_FLAG_FIRST_PIPE_INSTANCE
+            except PermissionError: # The pipe exists: another instance created it
+                return False
+            return True
+        import fcntl
+        self._lock_file = open(self.address + ".lock", "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close(); self._lock_file = None
+            return False
+        if os.path.exists(self.address): os.unlink(self.address) # Left behind by an instance that crashed
+        self.listener = Listener(self.address, family="AF_UNIX") # Connections queue up until serve()
+        return True
+
+    def serve(self, commands):
+        self.commands = commands
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ControlChannel", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        if not self.listener: return
+        self._stopping = True
+        if self._thread and self._thread.is_alive():
+            try:
+                _exchange(self.address, b"", timeout) # Wakes accept(); the thread then sees _stopping
+            except (OSError, EOFError):
+                pass
+            self._thread.join(timeout)
+        self.listener.close(); self.listener = None
+        if self._lock_file: self._lock_file.close(); self._lock_file = None
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                connection = self.listener.accept()
+            except OSError as e:
+                if self._stopping: return
+                print(f"WARNING: Control channel accept failed: {e}")
+                time.sleep(0.1); continue
+            with connection:
+                if self._stopping: return
+                try:
+                    if not connection.poll(2.0): continue # A client that never sends must not block the others
+                    words = connection.recv_bytes(MAX_REQUEST_BYTES).decode("utf-8").split("\n")
+                    ok, reply = run_command(self.commands, words)
+                    self.served += 1
+                    connection.send_bytes(f"{'ok' if ok else 'error'}\n{reply}".encode("utf-8"))
+                except (OSError, EOFError, UnicodeDecodeError) as e:
+                    print(f"WARNING: Control channel request failed: {e}")
+
+
+def run_command(commands, words):
+    """(ok, reply) of a command given as words, e.g. ["click", "AB/K"]; see ControlServer for `commands`."""
+    import inspect
+    name, args = (words[0].lower() if words and words[0] else "help"), words[1:]
+    if name not in commands:
+        listing = "\n".join(f"  {(command + ' ' + usage).strip():<32} {description}"
+                            for command, (handler, usage, description) in commands.items())
+        if name == "help": return True, f"Commands:\n{listing}"
+        return False, f"Unknown command '{name}'. Commands:\n{listing}"
+    handler, usage, description = commands[name]
+    try:
+        inspect.signature(handler).bind(*args)
+    except TypeError:
+        return False, f"Usage: {name} {usage}".rstrip()
+    try:
+        return True, handler(*args) or ""
+    except ValueError as e:
+        return False, str(e)
+    except Exception as e: # Keep serving; the reply says what went wrong
+        print(f"ERROR: Control command '{name}' failed: {e}")
+        return False, f"'{name}' failed: {e}"
+
+
+# --- Client ---
+def send_command(words, timeout=CONNECT_TIMEOUT):
+    """Runs a command in the running instance. Returns (ok, reply); raises NoInstanceError if none runs."""
+    address = control_address()
+    payload = "\n".join(words).encode("utf-8")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reply = _exchange(address, payload, REPLY_TIMEOUT)
+            break
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            if time.monotonic() > deadline or not _instance_starting(address):
+                raise NoInstanceError("Mouseless is not running.") from e
+            time.sleep(0.05)
+    status, _, text = reply.decode("utf-8").partition("\n")
+    return status == "ok", text
+
+def forward_command_line(words):
+    """Sends `words` (default: status) to the running instance and prints the reply. Returns an exit status."""
+    try:
+        ok, reply = send_command(list(words) or ["status"])
+    except (OSError, EOFError) as e: # NoInstanceError, or the instance went away mid-request
+        print(f"ERROR: {e}")
+        return 2
+    if reply: print(reply)
+    return 0 if ok else 1
+
+def _exchange(address, payload, timeout):
+    """Sends one request frame and returns the reply frame's data."""
+    if sys.platform == "win32":
+        from multiprocessing.connection import Client
+        with Client(address, family="AF_PIPE") as channel:
+            channel.send_bytes(payload)
+            if not channel.poll(timeout): raise TimeoutError("No reply from the running instance.")
+            return channel.recv_bytes()
+    import socket # multiprocessing.connection's framing by hand: importing it would triple the client's start-up
+    with socket.socket(socket.AF_UNIX) as channel:
+        channel.settimeout(timeout)
+        channel.connect(address)
+        channel.sendall(struct.pack("!i", len(payload)) + payload)
+        size, = struct.unpack("!i", _recv_exactly(channel, 4))
+        return _recv_exactly(channel, size)
+
+def _recv_exactly(channel, size):
+    chunks = []
+    while size:
+        chunk = channel.recv(size)
+        if not chunk: raise EOFError("The running instance closed the control channel.")
+        chunks.append(chunk); size -= len(chunk)
+    return b"".join(chunks)
+
+def _instance_starting(address):
+    """True while another process holds the instance lock but does not listen yet (POSIX only)."""
+    if sys.platform == "win32": return False # The pipe exists from the instance's first moment
+    import fcntl
+    try:
+        with open(address + ".lock") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+    return False
+
+
+if __name__ == "__main__":
+    # Lightweight client for scripts and hotkey daemons.
+    # Usage: python control_channel.py <command> [args...]   (python control_channel.py help lists them)
+    sys.exit(forward_command_line(sys.argv[1:]))
@@ -16,8 +16,8 @@ FREE_MODE_TOGGLE_KEY = '`' # Backtick key
 # - Pressing FREE_MODE_TOGGLE_KEY again exits Free Mode.
 # - Pressing LEFT_ALT_KEY_NAME (from style_config) to show the overlay will also exit Free Mode.
 
-MOUSE_MOVE_STEP = 20  # Pixels to move the mouse per key press in Free Mode
-SCROLL_STEP = 100       # Units to scroll per key press (OS/app dependent)
+MOUSE_MOVE_STEP = 20  # Pixels to move the mouse per key press in Free Mode (only with FREE_MODE_CONTINUOUS_MOTION = False)
+SCROLL_STEP = 100       # Units to scroll per key press (OS/app dependent; only with FREE_MODE_SMOOTH_SCROLL = False)
 
 # --- Keys for Free Mode Actions (ensure these are lowercase) ---
 FREE_MODE_MOUSE_UP = 'i'
@@ -30,6 +30,86 @@ FREE_MODE_SCROLL_DOWN = ',' # Comma key
 FREE_MODE_SCROLL_LEFT = 'b'
 FREE_MODE_SCROLL_RIGHT = 'n'
 
+# --- Free Mode Motion ---
+# The pointer moves continuously while movement keys are held (several at once move diagonally),
+# starting on key-down without waiting for key autorepeat and stopping on key-up.
+# Set to False to move MOUSE_MOVE_STEP pixels per key press (and autorepeat) instead.
+FREE_MODE_CONTINUOUS_MOTION = True
+FREE_MODE_TICK_HZ = 120           # Pointer updates per second while a movement key is held
+FREE_MODE_BASE_SPEED = 400        # Pixels per second right after key-down
+FREE_MODE_ACCELERATION = 1800     # Pixels per second added for every second the keys stay held
+FREE_MODE_MAX_SPEED = 2400        # Pixels per second, upper limit
+# With POINTER_BACKEND = "pyautogui" every injection pauses, so continuous motion/scrolling
+# is limited to a few updates per second; use a direct backend (the "auto" default).
+
+# --- Free Mode Scrolling ---
+# Scroll keys scroll smoothly while held, as many small wheel deltas at FREE_MODE_TICK_HZ,
+# and keep coasting briefly after release. Fractions of a notch are carried over.
+# Set to False to scroll SCROLL_STEP units per key press (and autorepeat) instead.
+FREE_MODE_SMOOTH_SCROLL = True
+# Send sub-notch deltas (Windows high-resolution wheel). Set to False if an application
+# scrolls a full step for every wheel message; whole notches are then sent at the same rate.
+FREE_MODE_SCROLL_HIGH_RESOLUTION = True
+FREE_MODE_SCROLL_BASE_SPEED = 8     # Wheel notches per second right after key-down
+FREE_MODE_SCROLL_ACCELERATION = 24  # Notches per second added for every second the key stays held
+FREE_MODE_SCROLL_MAX_SPEED = 40     # Notches per second, upper limit
+FREE_MODE_SCROLL_MOMENTUM = 0.15    # Seconds for the speed to fall to ~37% after release (0 = stop at once)
+
+
+# --- Grid Click Buttons ---
+# Mouse button clicked when a modifier is held while typing the sub-grid key.
+# Modifiers: "shift", "ctrl", "alt", "super"; buttons: "left", "right", "middle".
+# If several listed modifiers are held, the first one listed wins. No modifier = left click.
+# Unlisted modifiers also left-click. Example opt-in: {"shift": "right", "ctrl": "middle"}.
+CLICK_MODIFIER_BUTTONS = {"shift": "right"}
+
+
+# --- Overlay Window Behavior ---
+# Warm mode keeps the overlay window mapped and topmost at alpha 0.0 (and click-through)
+# while hidden, so showing it only flips the alpha instead of mapping/raising a window.
+# On Linux this needs a compositing window manager, otherwise alpha 0.0 is not transparent.
+OVERLAY_WARM_MODE = False
+# Click-through makes the *visible* overlay transparent to the pointer, so a grid click is injected
+# the moment its target is known and the overlay is hidden afterwards, off the critical path.
+# Falls back to hide-then-click where the platform does not support it.
+OVERLAY_CLICK_THROUGH = False
+# Before a grid click the overlay is hidden and the click waits for the window system to confirm
+# the unmap (<Unmap> event). This is only the upper bound in seconds if that confirmation never comes.
+OVERLAY_UNMAP_TIMEOUT = 0.1
+# Print how long it took from the Alt toggle until the overlay was visible.
+REPORT_OVERLAY_LATENCY = False
+
+# --- Monitors ---
+# Rebuild the grids when monitors are connected, removed or rearranged (XRandR events on
+# Linux/X11, WM_DISPLAYCHANGE on Windows). Without it, restart the app after docking/undocking.
+WATCH_MONITOR_CHANGES = True
+
+
+# --- Startup ---
+# A startup phase report (imports, key maps, monitors, layouts, windows, hooks, tray) is printed
+# at every start. With a budget, a slower start prints a warning, and `main_script.py --startup-check`
+# (or `python startup_profile.py`, which runs it several times) exits with status 1. 0 = no budget.
+# Measured up to the key dispatch phase: 60-100 ms (imports ~60-80 ms, layouts ~2 ms from the layout
+# cache, ~12 ms compiled); windows, hooks and the tray icon add a few hundred ms. 1000 ms leaves about
+# a 2x margin over a typical full start, so a real regression fails the check.
+STARTUP_BUDGET_MS = 1000
+# Keep the compiled grids (labels, label trie, cell geometry, click targets, font sizes) in the user
+# cache directory and memory-map them on later launches. They are recompiled whenever key_config.py,
+# style_config.py or the monitor sizes change. Set to False to compile at every start.
+USE_LAYOUT_CACHE = True
+
+
+# --- Pointer Injection ---
+# "auto" uses SendInput on Windows and XTest on Linux/X11, which inject moves, clicks and
+# scrolls without pyautogui's per-call pause (and without its fail-safe corner check).
+# "pyautogui" restores the old path. See pointer_backend.py; `python pointer_backend.py` benchmarks them.
+POINTER_BACKEND = "auto" # "auto", "sendinput", "xtest" or "pyautogui"
+# The keyboard hook queues pointer actions for a dedicated executor thread (action_queue.py).
+# Actions arriving while this many are still pending are dropped.
+ACTION_QUEUE_SIZE = 64
+# Other threads post render commands that the Tk thread drains (and coalesces) once per frame.
+UI_FRAME_INTERVAL_MS = 16
+
 
 if __name__ == "__main__":
     print("--- Feature Configurations (feature_config.py) ---")
@@ -37,6 +117,13 @@ if __name__ == "__main__":
     print(f"Free Mode Toggle Key: '{FREE_MODE_TOGGLE_KEY}'")
     print(f"Mouse Move Step: {MOUSE_MOVE_STEP} pixels")
     print(f"Scroll Step: {SCROLL_STEP} units")
+    print(f"Smooth Scroll: {FREE_MODE_SMOOTH_SCROLL} (high-res {FREE_MODE_SCROLL_HIGH_RESOLUTION}, {FREE_MODE_SCROLL_BASE_SPEED}-{FREE_MODE_SCROLL_MAX_SPEED} notches/s, momentum {FREE_MODE_SCROLL_MOMENTUM}s)")
+    print(f"Continuous Motion: {FREE_MODE_CONTINUOUS_MOTION} ({FREE_MODE_TICK_HZ} Hz, {FREE_MODE_BASE_SPEED} px/s + {FREE_MODE_ACCELERATION} px/s^2, max {FREE_MODE_MAX_SPEED} px/s)")
+    print(f"Click Modifier Buttons: {CLICK_MODIFIER_BUTTONS}")
+    print(f"Overlay Warm Mode: {OVERLAY_WARM_MODE}, Report Overlay Latency: {REPORT_OVERLAY_LATENCY}")
+    print(f"Overlay Click-Through: {OVERLAY_CLICK_THROUGH}, Overlay Unmap Timeout: {OVERLAY_UNMAP_TIMEOUT}s")
+    print(f"Watch Monitor Changes: {WATCH_MONITOR_CHANGES}, Startup Budget: {STARTUP_BUDGET_MS or 'none'} ms, Layout Cache: {USE_LAYOUT_CACHE}")
+    print(f"Pointer Backend: {POINTER_BACKEND}, Action Queue Size: {ACTION_QUEUE_SIZE}, UI Frame Interval: {UI_FRAME_INTERVAL_MS} ms")
     print("Free Mode Action Keys:")
     print(f"  Mouse Up: '{FREE_MODE_MOUSE_UP}', Down: '{FREE_MODE_MOUSE_DOWN}', Left: '{FREE_MODE_MOUSE_LEFT}', Right: '{FREE_MODE_MOUSE_RIGHT}'")
     print(f"  Scroll Up: '{FREE_MODE_SCROLL_UP}', Down: '{FREE_MODE_SCROLL_DOWN}', Left: '{FREE_MODE_SCROLL_LEFT}', Right: '{FREE_MODE_SCROLL_RIGHT}'")
\ No newline at end of file
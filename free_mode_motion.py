@@ -0,0 +1,234 @@
+# free_mode_motion.py
+
+# --- Free Mode Motion Engine ---
+# Moving the pointer once per KEY_DOWN ties its speed to the OS key autorepeat
+# (a pause before the first repeat, then a fixed rate). Instead, the engine
+# tracks which direction keys are held and moves the pointer on its own thread
+# at a fixed tick rate: movement starts on key-down, stops on key-up, and its
+# speed follows a velocity/acceleration curve. Fractions of a pixel carry over
+# between ticks, so slow speeds and diagonals stay smooth.
+#
+# ScrollEngine does the same for the wheel: while scroll keys are held it emits
+# small wheel deltas every tick, and after release it coasts with decaying speed.
+#
+# The threads sleep on an Event while no key is held, so an idle engine costs
+# nothing. (time.sleep() is precise enough for 120 Hz on Linux/macOS and on
+# Windows with Python 3.11+, which uses high-resolution timers.)
+import math
+import threading
+import time
+
+class FixedRateEngine:
+    """
+    Runs `_tick()` every `1 / tick_hz` seconds on its own thread for as long as
+    it returns True, then sleeps until `_wake` is set again. Subclasses keep
+    their input state under `_lock` and set `_wake` after changing it.
+    """
+    thread_name = "FixedRateEngine"
+
+    def __init__(self, tick_hz):
+        self.period = 1.0 / tick_hz
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self.ticks = 0
+        self.late_ticks = 0 # Ticks that started after their slot had already passed
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        if not self._thread: return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _begin(self):
+        """Called before the first tick of each active period."""
+
+    def _tick(self, elapsed):
+        """One step, `elapsed` seconds into the active period. Returns False when there is nothing left to do."""
+        return False
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if self._stopping: return
+            # Input that arrives after this clear sets _wake again, so it starts another active period.
+            self._wake.clear()
+            self._tick_while_active()
+
+    def _tick_while_active(self):
+        started = next_tick = time.perf_counter()
+        self._begin()
+        while not self._stopping and self._tick(next_tick - started):
+            self.ticks += 1
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+            else: # Fell behind (e.g. the process was descheduled): skip the missed slots instead of bursting
+                self.late_ticks += 1
+                next_tick = time.perf_counter()
+
+
+class MotionEngine(FixedRateEngine):
+    """
+    move         -- callable(dx, dy) with integer pixels, called from the engine thread
+    tick_hz      -- ticks per second while a key is held
+    base_speed   -- pixels per second right after key-down
+    acceleration -- pixels per second squared added while keys stay held
+    max_speed    -- pixels per second cap
+    """
+    thread_name = "MotionEngine"
+
+    def __init__(self, move, tick_hz=120, base_speed=400.0, acceleration=1800.0, max_speed=2400.0):
+        super().__init__(tick_hz)
+        self.move = move
+        self.base_speed, self.acceleration, self.max_speed = base_speed, acceleration, max_speed
+        self._held = set() # Held unit directions, e.g. (0, -1) for up
+        self._carry_x = self._carry_y = 0.0
+
+    def press(self, direction):
+        """Starts moving in `direction` ((dx, dy) with -1/0/1 entries). Key autorepeat is harmless."""
+        with self._lock:
+            self._held.add(direction)
+            self._wake.set()
+
+    def release(self, direction):
+        with self._lock:
+            self._held.discard(direction)
+
+    def release_all(self):
+        with self._lock:
+            self._held.clear()
+
+    def speed_at(self, held_for):
+        """Pixels per second after the keys have been held for `held_for` seconds."""
+        return min(self.max_speed, self.base_speed + self.acceleration * held_for)
+
+    def _begin(self):
+        self._carry_x = self._carry_y = 0.0
+
+    def _tick(self, elapsed):
+        with self._lock:
+            if not self._held: return False
+            vector_x = sum(dx for dx, _ in self._held)
+            vector_y = sum(dy for _, dy in self._held)
+        length = math.hypot(vector_x, vector_y)
+        if length: # Opposite keys cancel out; diagonals move at the same speed as straight lines
+            step = self.speed_at(elapsed) * self.period / length
+            self._carry_x += vector_x * step; self._carry_y += vector_y * step
+            dx, dy = int(self._carry_x), int(self._carry_y)
+            self._carry_x -= dx; self._carry_y -= dy
+            if dx or dy: self.move(dx, dy)
+        return True
+
+
+class ScrollEngine(FixedRateEngine):
+    """
+    Scrolls while scroll keys are held, as a stream of small wheel deltas, and
+    keeps scrolling with decaying speed after release. Both axes accumulate
+    fractions, so nothing is lost to rounding at any speed.
+
+    scroll, hscroll  -- callable(units) with integer wheel units (positive = up / right)
+    units_per_notch  -- wheel units of one notch for the pointer backend (120 on Windows, 1 on X11)
+    high_resolution  -- emit sub-notch deltas where units_per_notch allows it; otherwise only
+                        whole notches, for applications that act on every wheel message
+    base_speed, acceleration, max_speed -- notches per second (and per second squared)
+    momentum         -- seconds for the speed to fall to 1/e after release; 0 stops at once
+    """
+    thread_name = "ScrollEngine"
+    STOP_SPEED = 0.5 # Notches per second below which momentum ends
+
+    def __init__(self, scroll, hscroll, units_per_notch, tick_hz=120, high_resolution=True,
+                 base_speed=8.0, acceleration=24.0, max_speed=40.0, momentum=0.15):
+        super().__init__(tick_hz)
+        self.scroll, self.hscroll = scroll, hscroll
+        self.units_per_notch = units_per_notch
+        self.quantum = 1 if high_resolution else units_per_notch # Smallest delta emitted, in units
+        self.base_speed, self.acceleration, self.max_speed = base_speed, acceleration, max_speed
+        self.decay = math.exp(-self.period / momentum) if momentum > 0 else 0.0
+        self._held = set() # Held directions: (dx, dy), +1 = right / up
+        self._held_since = 0.0
+        self._velocity = [0.0, 0.0] # Notches per second, (x, y)
+        self._carry = [0.0, 0.0] # Wheel units not emitted yet
+
+    def press(self, direction):
+        with self._lock:
+            if not self._held: self._held_since = time.perf_counter()
+            self._held.add(direction)
+            self._wake.set()
+
+    def release(self, direction):
+        with self._lock:
+            self._held.discard(direction)
+
+    def release_all(self, keep_momentum=False):
+        with self._lock:
+            self._held.clear()
+            if not keep_momentum: self._velocity = [0.0, 0.0]; self._carry = [0.0, 0.0]
+
+    def speed_at(self, held_for):
+        """Notches per second after the keys have been held for `held_for` seconds."""
+        return min(self.max_speed, self.base_speed + self.acceleration * held_for)
+
+    def _tick(self, elapsed):
+        with self._lock:
+            held = tuple(self._held)
+            speed = self.speed_at(time.perf_counter() - self._held_since) if held else 0.0
+            vector = (sum(dx for dx, _ in held), sum(dy for _, dy in held))
+            moving = False
+            for axis in (0, 1):
+                if vector[axis]: self._velocity[axis] = speed * (1 if vector[axis] > 0 else -1)
+                else:
+                    self._velocity[axis] *= self.decay
+                    if abs(self._velocity[axis]) < self.STOP_SPEED: self._velocity[axis] = 0.0
+                self._carry[axis] += self._velocity[axis] * self.period * self.units_per_notch
+                moving = moving or self._velocity[axis] != 0.0
+            deltas = []
+            for axis in (0, 1):
+                units = int(self._carry[axis] / self.quantum) * self.quantum
+                self._carry[axis] -= units
+                deltas.append(units)
+            if not moving: self._carry = [0.0, 0.0]
+        if deltas[1]: self.scroll(deltas[1])
+        if deltas[0]: self.hscroll(deltas[0])
+        return bool(held) or moving
+
+
+if __name__ == "__main__":
+    # Demo: hold "right" for one second, then "right"+"down" for half a second,
+    # recording the moves instead of injecting them.
+    moves = []
+    engine = MotionEngine(lambda dx, dy: moves.append((time.perf_counter(), dx, dy)))
+    engine.start()
+    engine.press((1, 0)); time.sleep(1.0)
+    engine.press((0, 1)); time.sleep(0.5)
+    engine.release_all(); time.sleep(0.05)
+    engine.stop()
+    total_x, total_y = sum(dx for _, dx, _ in moves), sum(dy for _, _, dy in moves)
+    intervals = [b[0] - a[0] for a, b in zip(moves, moves[1:])]
+    print(f"{len(moves)} moves in {engine.ticks} ticks ({engine.late_ticks} late), total ({total_x}, {total_y}) px")
+    print(f"Move interval: avg {sum(intervals) / len(intervals) * 1000:.2f} ms, max {max(intervals) * 1000:.2f} ms")
+
+    # Scrolling: hold "down" for half a second, then coast on momentum, for
+    # Windows-style (120 units per notch) and X11-style (1 unit per notch) wheels.
+    for units_per_notch, high_resolution in ((120, True), (120, False), (1, True)):
+        deltas = []
+        scroller = ScrollEngine(lambda units: deltas.append((time.perf_counter(), units)), lambda units: None,
+                                units_per_notch, high_resolution=high_resolution)
+        scroller.start()
+        pressed_at = time.perf_counter()
+        scroller.press((0, -1)); time.sleep(0.5)
+        released_at = time.perf_counter()
+        scroller.release((0, -1)); time.sleep(1.0)
+        scroller.stop()
+        after_release = [units for at, units in deltas if at >= released_at]
+        print(f"Scroll ({units_per_notch} units/notch, {'high-res' if high_resolution else 'whole notches'}): "
+              f"{len(deltas)} deltas, {sum(units for _, units in deltas) / units_per_notch:.2f} notches "
+              f"({sum(after_release) / units_per_notch:.2f} from momentum)")
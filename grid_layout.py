@@ -0,0 +1,150 @@
+# grid_layout.py
+
+# --- Compiled Grid Layouts ---
+# A key map ("QW": (row, col)) is compiled once into a GridLayout for a given
+# pixel area. Cells are addressed by a flat index (row * cols + col) and their
+# geometry lives in flat arrays, so drawing and keystroke resolution are plain
+# lookups with no per-event dict construction.
+from array import array
+
+class GridLayout:
+    """
+    Compiled form of one grid.
+
+    key_map        -- forward map, label -> (row, col) (as returned by key_config)
+    key_to_index   -- label -> flat cell index
+    labels         -- flat cell index -> label ("" for unmapped cells)
+    rects          -- array('d'), 4 entries per cell: x1, y1, x2, y2
+    centers        -- array('i'), 2 entries per cell: click x, click y
+    """
+
+    def __init__(self, key_map, cols, rows, x, y, width, height):
+        self.key_map = key_map
+        self.cols, self.rows = cols, rows
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.cell_width, self.cell_height = width / cols, height / rows
+        cell_count = cols * rows
+
+        self.labels = cell_labels(key_map, cols, rows)
+        self.key_to_index = {key_label: r_idx * cols + c_idx for key_label, (r_idx, c_idx) in key_map.items()
+                             if 0 <= r_idx < rows and 0 <= c_idx < cols}
+
+        self.rects = array("d", bytes(8 * 4 * cell_count))
+        self.centers = array("i", bytes(4 * 2 * cell_count))
+        for index in range(cell_count):
+            r_idx, c_idx = divmod(index, cols)
+            x1, y1 = x + c_idx * self.cell_width, y + r_idx * self.cell_height
+            self.rects[4 * index:4 * index + 4] = array("d", (x1, y1, x1 + self.cell_width, y1 + self.cell_height))
+            self.centers[2 * index] = int(x1 + self.cell_width / 2)
+            self.centers[2 * index + 1] = int(y1 + self.cell_height / 2)
+
+    @classmethod
+    def from_arrays(cls, cols, rows, x, y, width, height, labels, rects, centers, key_to_index=None, key_map=None):
+        """
+        A layout from previously compiled labels, rects and centers (e.g. memory-mapped by
+        layout_cache.py). Layouts of the same grid can share `labels`, `key_to_index` and `key_map`.
+        """
+        layout = cls.__new__(cls)
+        layout.cols, layout.rows = cols, rows
+        layout.x, layout.y, layout.width, layout.height = x, y, width, height
+        layout.cell_width, layout.cell_height = width / cols, height / rows
+        layout.labels = labels
+        if key_to_index is None: key_to_index = {key_label: index for index, key_label in enumerate(labels) if key_label}
+        layout.key_to_index = key_to_index
+        if key_map is None: key_map = {key_label: divmod(index, cols) for key_label, index in key_to_index.items()}
+        layout.key_map = key_map
+        layout.rects, layout.centers = rects, centers
+        return layout
+
+    def __len__(self):
+        return self.cols * self.rows
+
+    def index_of(self, key_label):
+        """Flat cell index for a label, or -1 if the label is not mapped."""
+        return self.key_to_index.get(key_label, -1)
+
+    def index_at(self, r_idx, c_idx):
+        return r_idx * self.cols + c_idx
+
+    def rect(self, index):
+        """(x1, y1, x2, y2) of a cell."""
+        return tuple(self.rects[4 * index:4 * index + 4])
+
+    def center(self, index):
+        """Integer click point (x, y) at the middle of a cell."""
+        return self.centers[2 * index], self.centers[2 * index + 1]
+
+
+def cell_labels(key_map, cols, rows):
+    """Flat cell index -> label ("" for unmapped cells); entries outside the grid are ignored."""
+    labels = [""] * (cols * rows)
+    for key_label, (r_idx, c_idx) in key_map.items():
+        if 0 <= r_idx < rows and 0 <= c_idx < cols: labels[r_idx * cols + c_idx] = key_label
+    return labels
+
+def compile_main_layout(key_map, cols, rows, screen_width, screen_height, origin_x=0, origin_y=0):
+    """Main grid layout covering the whole screen."""
+    return GridLayout(key_map, cols, rows, origin_x, origin_y, screen_width, screen_height)
+
+def compile_sub_layout(key_map, cols, rows, cell_width, cell_height):
+    """
+    Sub-grid layout for one main cell, relative to the cell's top-left corner.
+    All main cells have the same size, so one compiled sub layout serves every
+    cell: add the main cell's (x1, y1) to its rects and centers.
+    """
+    return GridLayout(key_map, cols, rows, 0, 0, cell_width, cell_height)
+
+
+class ClickTargets:
+    """
+    Integer click point of every (main cell, sub cell) pair, precomputed from a
+    main layout and the sub layout that subdivides its cells. Resolving a full
+    three-key target is then two index lookups: main_layout.index_of() for the
+    combo, sub_layout.index_of() for the sub key, and target() here.
+
+    points -- array('i'), 2 entries per pair at 2 * (main_index * sub_count + sub_index),
+              relative to the layouts' origin; target() adds (origin_x, origin_y),
+              the top-left corner of the layouts' monitor, to give screen coordinates
+    """
+
+    def __init__(self, main_layout, sub_layout, origin_x=0, origin_y=0):
+        self.main_count, self.sub_count = len(main_layout), len(sub_layout)
+        self.origin_x, self.origin_y = origin_x, origin_y
+        sub_centers_x = [(sub_layout.rects[4 * i] + sub_layout.rects[4 * i + 2]) / 2 for i in range(self.sub_count)]
+        sub_centers_y = [(sub_layout.rects[4 * i + 1] + sub_layout.rects[4 * i + 3]) / 2 for i in range(self.sub_count)]
+        points = []
+        for main_index in range(self.main_count):
+            main_x1, main_y1 = main_layout.rects[4 * main_index], main_layout.rects[4 * main_index + 1]
+            for sub_index in range(self.sub_count):
+                points.append(int(main_x1 + sub_centers_x[sub_index]))
+                points.append(int(main_y1 + sub_centers_y[sub_index]))
+        self.points = array("i", points)
+
+    @classmethod
+    def from_points(cls, main_count, sub_count, points, origin_x=0, origin_y=0):
+        """Click targets from previously compiled points (e.g. memory-mapped by layout_cache.py)."""
+        targets = cls.__new__(cls)
+        targets.main_count, targets.sub_count = main_count, sub_count
+        targets.origin_x, targets.origin_y = origin_x, origin_y
+        targets.points = points
+        return targets
+
+    def target(self, main_index, sub_index):
+        offset = 2 * (main_index * self.sub_count + sub_index)
+        return self.origin_x + self.points[offset], self.origin_y + self.points[offset + 1]
+
+
+if __name__ == "__main__":
+    from key_config import (MAIN_GRID_COLS, MAIN_GRID_ROWS, SUB_GRID_COLS, SUB_GRID_ROWS,
+                            get_main_grid_key_map, get_sub_grid_key_map)
+    main_layout = compile_main_layout(get_main_grid_key_map(), MAIN_GRID_COLS, MAIN_GRID_ROWS, 1920, 1080)
+    print(f"Main layout: {len(main_layout)} cells, {len(main_layout.key_to_index)} labels")
+    for label in ("QQ", "TT", "//"):
+        index = main_layout.index_of(label)
+        print(f"  {label}: index {index}, rect {main_layout.rect(index)}, center {main_layout.center(index)}")
+    sub_layout = compile_sub_layout(get_sub_grid_key_map(), SUB_GRID_COLS, SUB_GRID_ROWS,
+                                    main_layout.cell_width, main_layout.cell_height)
+    print(f"Sub layout: {len(sub_layout)} cells, {len(sub_layout.key_to_index)} labels")
+    click_targets = ClickTargets(main_layout, sub_layout)
+    print(f"Click targets: {len(click_targets.points) // 2} points ({click_targets.points.itemsize * len(click_targets.points)} bytes)")
+    print(f"  QQ + A: {click_targets.target(main_layout.index_of('QQ'), sub_layout.index_of('A'))}")
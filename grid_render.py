@@ -0,0 +1,114 @@
+# grid_render.py
+
+# --- Grid Rendering Helpers ---
+# A grid of rows x cols cells only needs rows+1 horizontal and cols+1 vertical
+# lines. Drawing those instead of one outline rectangle per cell keeps the
+# number of canvas items at O(rows + cols) instead of O(rows * cols).
+from functools import lru_cache
+import tkinter.font as tkfont
+
+# Dash patterns for GRID_LINE_STYLE (see style_config.py). "line" is solid.
+GRID_LINE_DASH_PATTERNS = {
+    "line": None,
+    "dashes": (4, 4),
+    "dots": (1, 3),
+}
+
+def grid_line_options(color, line_width, line_style, tags=()):
+    """Returns the create_line() options shared by every grid line."""
+    options = {"fill": color, "width": line_width, "tags": tags}
+    dash = GRID_LINE_DASH_PATTERNS.get(line_style)
+    if dash: options["dash"] = dash
+    return options
+
+def draw_grid_lines(canvas, x, y, width, height, cols, rows, color, line_width, line_style, tags=()):
+    """
+    Draws the outline of a cols x rows grid covering (x, y, x+width, y+height)
+    as rows+1 horizontal and cols+1 vertical lines.
+    Returns the number of canvas items created.
+    """
+    options = grid_line_options(color, line_width, line_style, tags)
+    cell_width, cell_height = width / cols, height / rows
+    x2, y2 = x + width, y + height
+    for r_idx in range(rows + 1):
+        line_y = y + r_idx * cell_height
+        canvas.create_line(x, line_y, x2, line_y, **options)
+    for c_idx in range(cols + 1):
+        line_x = x + c_idx * cell_width
+        canvas.create_line(line_x, y, line_x, y2, **options)
+    return rows + cols + 2
+
+def label_font_size(cell_width, cell_height, key_label, font_size_behavior, fixed_size):
+    """Font size (points) for a cell label: fits the cell when "dynamic", else the fixed size."""
+    if font_size_behavior != "dynamic": return fixed_size
+    return _dynamic_font_size(cell_width, cell_height, len(key_label))
+
+@lru_cache(maxsize=256)
+def _dynamic_font_size(cell_width, cell_height, label_length):
+    # Every cell of a grid has the same size and labels come in a few lengths,
+    # so this only ever sees a handful of distinct arguments.
+    return max(6, min(int(cell_height / 2.5),
+                      int(cell_width / (label_length + 0.5) * 1.2 if label_length else cell_width / 1.5)))
+
+# --- Shared Tk font objects ---
+# Passing a (family, size, weight) tuple makes Tk resolve a font for every text
+# item. A named tkinter.font.Font is resolved once and shared by all items using it.
+_label_fonts = {}
+
+def get_label_font(root, family, size, weight):
+    """Returns the shared tkinter.font.Font for (family, size, weight), creating it on first use."""
+    key = (family, size, weight)
+    font = _label_fonts.get(key)
+    if font is None:
+        font = tkfont.Font(root=root, family=family, size=size, weight=weight)
+        _label_fonts[key] = font
+    return font
+
+def clear_label_fonts():
+    """Forgets the shared fonts. Call when the Tk root they belong to is destroyed."""
+    _label_fonts.clear()
+
+def draw_grid_rectangles(canvas, x, y, width, height, cols, rows, color, line_width, line_style, tags=()):
+    """
+    Previous renderer: one outline rectangle per cell. Kept for the benchmark below.
+    Returns the number of canvas items created.
+    """
+    options = {"outline": color, "width": line_width, "tags": tags}
+    dash = GRID_LINE_DASH_PATTERNS.get(line_style)
+    if dash: options["dash"] = dash
+    cell_width, cell_height = width / cols, height / rows
+    for r_idx in range(rows):
+        for c_idx in range(cols):
+            x1, y1 = x + c_idx * cell_width, y + r_idx * cell_height
+            canvas.create_rectangle(x1, y1, x1 + cell_width, y1 + cell_height, **options)
+    return rows * cols
+
+
+if __name__ == "__main__":
+    # Benchmark: canvas item count and draw time of both renderers.
+    # Usage: python grid_render.py [width height]
+    import sys
+    import time
+    import tkinter as tk
+
+    width, height = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) >= 3 else (3840, 2160)
+    grid_sizes = [(25, 36), (60, 80)]  # (cols, rows): default grid and a dense grid
+    repeats = 20
+
+    root = tk.Tk()
+    root.withdraw()
+    bench_canvas = tk.Canvas(root, width=width, height=height)
+
+    print(f"--- Grid outline rendering benchmark ({width}x{height}, {repeats} draws each) ---")
+    for cols, rows in grid_sizes:
+        for name, renderer in (("rectangles", draw_grid_rectangles), ("lines", draw_grid_lines)):
+            total = 0.0
+            for _ in range(repeats):
+                bench_canvas.delete("all")
+                start = time.perf_counter()
+                renderer(bench_canvas, 0, 0, width, height, cols, rows, "white", 1, "dashes", ("grid",))
+                bench_canvas.update_idletasks()
+                total += time.perf_counter() - start
+            item_count = len(bench_canvas.find_all())
+            print(f"  {cols}x{rows} {name:<10}: {item_count:5d} items, {total / repeats * 1000:7.2f} ms per draw")
+    root.destroy()
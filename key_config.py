@@ -7,15 +7,30 @@ MAIN_GRID_ROWS = 36
 SUB_GRID_COLS = 8
 SUB_GRID_ROWS = 3 # For a 3x8 sub-grid as in previous examples
 
+# --- Main Grid Labels ---
+# "pattern":   the two-key scheme of get_main_grid_key_map() below (at most 25x36 cells).
+# "generated": labels from MAIN_GRID_LABEL_ALPHABET for any grid size, e.g. finer grids on
+#              5K/ultrawide screens. No label is a prefix of another (see label_trie.py).
+MAIN_GRID_LABEL_MODE = "pattern"
+MAIN_GRID_LABEL_ALPHABET = "QWERTASDFGZXCVBYUIOPHJKL;NM,./" # Letters, digits and ; , . / only
+# "generated" only: 0 = as short as possible (lengths differ by at most one, e.g. mixed
+# one- and two-key labels), n = every label exactly n keys long (e.g. 3).
+MAIN_GRID_LABEL_LENGTH = 0
+
 def get_main_grid_key_map():
     """
     Programmatically generates 2-character key combinations for the main grid
-    based on the specified pattern:
+    based on the specified pattern (with MAIN_GRID_LABEL_MODE = "generated",
+    labels come from label_trie.generate_grid_key_map() instead):
     - The first character of the key combo comes from a set that cycles every 6 rows.
     - The second character of the key combo comes from a set that cycles for each row within that 6-row block.
     - Each combination of a first character (from its set) and a second character (from its set)
       forms a key for a column.
     """
+    if MAIN_GRID_LABEL_MODE == "generated":
+        from label_trie import generate_grid_key_map
+        return generate_grid_key_map(MAIN_GRID_COLS, MAIN_GRID_ROWS, MAIN_GRID_LABEL_ALPHABET.upper(), MAIN_GRID_LABEL_LENGTH)
+
     keys = {}
     
     # Define the character sets for the first character of the key combo
@@ -131,6 +146,7 @@ if __name__ == '__main__':
     
     print(f"\n--- Main Grid Key Mappings ({MAIN_GRID_ROWS} rows x {MAIN_GRID_COLS} cols) ---")
     main_map = get_main_grid_key_map()
+    print(f"Label mode: {MAIN_GRID_LABEL_MODE}" + (f" (alphabet '{MAIN_GRID_LABEL_ALPHABET}', length {MAIN_GRID_LABEL_LENGTH or 'shortest'})" if MAIN_GRID_LABEL_MODE == "generated" else ""))
     print(f"Total number of main grid keys generated: {len(main_map)}")
     
     print("\nSample Main Grid Keys (Key: (Row, Col)) to verify pattern:")
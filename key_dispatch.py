@@ -0,0 +1,80 @@
+# key_dispatch.py
+
+# --- Compiled Key Dispatch ---
+# The configuration is compiled once at startup into a table keyed by
+# (mode, event type, key name) whose values are the actions to run, with one
+# fallback action per (mode, event type). Handling a keystroke is then two dict
+# lookups instead of a chain of string comparisons.
+#
+# Modes: "idle" (nothing active), "overlay" (grid shown), "free" (Free Mode).
+DISPATCH_MODES = ("idle", "overlay", "free")
+
+class KeyDispatchTable:
+    def __init__(self, event_types):
+        # mode -> event type -> ({key name: action}, fallback action or None). Nested
+        # dicts rather than tuple keys: the hook then builds no key objects per event.
+        self.tables = {mode: {event_type: ({}, None) for event_type in event_types} for mode in DISPATCH_MODES}
+
+    def bind(self, modes, event_type, key_name, action):
+        """Runs `action(event, key_name)` for `key_name` in each of `modes`. Later binds win."""
+        for mode in modes:
+            self.tables[mode][event_type][0][key_name] = action
+
+    def bind_fallback(self, modes, event_type, action):
+        """Runs `action(event, key_name)` for keys without their own binding in each of `modes`."""
+        for mode in modes:
+            self.tables[mode][event_type] = (self.tables[mode][event_type][0], action)
+
+    def __len__(self):
+        return sum(len(actions) for by_type in self.tables.values() for actions, _ in by_type.values())
+
+if __name__ == "__main__":
+    # Replay benchmark: per-event cost of main_script.global_key_event_handler for
+    # idle typing, overlay input and Free Mode. Pointer/render work is only queued
+    # (the executor and Tk are not started), so this measures the hook itself.
+    # Usage: python key_dispatch.py [events_per_scenario]
+    import sys
+    import time
+    from collections import namedtuple
+
+    import main_script
+
+    FakeEvent = namedtuple("FakeEvent", "name event_type time scan_code")
+    KEY_DOWN, KEY_UP = main_script.keyboard.KEY_DOWN, main_script.keyboard.KEY_UP
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    def key_stream(names):
+        now = time.time()
+        return [FakeEvent(name, event_type, now, 0) for name in names for event_type in (KEY_DOWN, KEY_UP)]
+
+    def replay(setup, names):
+        events = key_stream(names)[:count]
+        setup()
+        start = time.perf_counter()
+        for event in events:
+            main_script.global_key_event_handler(event)
+        elapsed = time.perf_counter() - start
+        return elapsed / len(events) * 1e6
+
+    def reset_state():
+        main_script.free_mode_active = False
+        main_script.hide_overlay()
+
+    def enter_free_mode():
+        reset_state(); main_script.free_mode_active = True
+
+    prose = list("the quick brown fox jumps over the lazy dog") * (count // 80 + 1)
+    overlay_keys = ["q", "w", "1"] * (count // 6 + 1) # first key, second key (sub-grid), back to the main grid
+    free_keys = [main_script.FREE_MODE_MOUSE_UP, main_script.FREE_MODE_MOUSE_LEFT,
+                 main_script.FREE_MODE_SCROLL_DOWN, "x"] * (count // 8 + 1)
+
+    def enter_overlay():
+        reset_state(); main_script.show_overlay()
+
+    print(f"--- Key handler replay benchmark ({count} events per scenario) ---")
+    for label, setup, names in (("idle typing", reset_state, prose),
+                                ("overlay input", enter_overlay, overlay_keys),
+                                ("free mode", enter_free_mode, free_keys)):
+        main_script.action_executor.submit = lambda *args: True # Keep the unstarted queue from filling up
+        print(f"  {label:<14}: {replay(setup, names):7.2f} us per event")
+    reset_state()
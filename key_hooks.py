@@ -0,0 +1,198 @@
+# key_hooks.py
+
+# --- Adaptive Keyboard Hooking ---
+# A global keyboard.hook() hands every keystroke typed anywhere, all day long, to
+# our Python handler. While nothing is active only a few keys matter (the overlay
+# toggle, the Free Mode toggle, a pending blind double-click key), so in that
+# state only those keys are hooked with keyboard.hook_key(). The full hook is
+# installed while something needs every key: the overlay or Free Mode is active,
+# or the toggle key is held and a chord (Alt+Tab, ...) must be recognized.
+#
+# The `keyboard` library runs per-key hooks before the global hooks for the same
+# event, so the event that makes a key hook install the full hook would reach
+# the handler twice; it is skipped by identity.
+#
+# `keyboard` files each hook in one registry keyed by its callback, so every key
+# hook gets its own callback object. keyboard.unhook_all() empties the hook lists
+# but not that registry; stop() after it only drops our handles.
+import functools
+import threading
+
+class AdaptiveKeyboardHook:
+    """
+    handler -- callable(event) that receives each event once
+    backend -- module providing hook(), hook_key() and unhook() (the `keyboard` module)
+    """
+
+    def __init__(self, handler, backend=None):
+        if backend is None:
+            import keyboard as backend
+        self.handler = handler
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._started = False
+        self._want_full = False
+        self._full_hook = None
+        self._trigger_keys = set()
+        self._key_hooks = {} # key name -> remove handle from hook_key()
+        self._last_key_hook_event = None
+        self.key_hook_events = 0
+        self.full_hook_events = 0
+
+    def start(self):
+        with self._lock:
+            self._started = True
+            self._apply()
+
+    def stop(self):
+        with self._lock:
+            self._started = False
+            self._apply()
+
+    def set_trigger_keys(self, keys):
+        """Keys that must reach the handler even while the full hook is off."""
+        with self._lock:
+            self._trigger_keys = set(keys)
+            self._apply()
+
+    @property
+    def full(self):
+        """Whether the hook that sees every key is wanted (installed while started)."""
+        return self._want_full
+
+    def set_full(self, enabled):
+        """Installs (or removes) the hook that sees every key."""
+        with self._lock:
+            if self._want_full == enabled: return
+            self._want_full = enabled
+            self._apply()
+
+    def _apply(self):
+        wanted_keys = self._trigger_keys if self._started else set()
+        for key in list(self._key_hooks):
+            if key not in wanted_keys: self._unhook(self._key_hooks.pop(key))
+        for key in wanted_keys:
+            if key in self._key_hooks: continue
+            try:
+                self._key_hooks[key] = self.backend.hook_key(key, functools.partial(self._on_trigger_key)) # A distinct callback per key
+            except ValueError as e: # Key name unknown to the keyboard layout
+                print(f"WARNING: Cannot hook key '{key}': {e}")
+
+        want_full = self._started and self._want_full
+        if want_full and self._full_hook is None:
+            self._full_hook = self.backend.hook(self._on_any_key)
+        elif not want_full and self._full_hook is not None:
+            self._unhook(self._full_hook)
+            self._full_hook = None
+
+    def _unhook(self, handle):
+        try:
+            self.backend.unhook(handle)
+        except (KeyError, ValueError): # Already removed by keyboard.unhook_all()
+            pass
+
+    def _on_trigger_key(self, event):
+        if self._full_hook is not None: return # The full hook delivers this event
+        self._last_key_hook_event = event
+        self.key_hook_events += 1
+        try:
+            self.handler(event)
+        except Exception as e: # `keyboard` runs key hooks unguarded: an exception would end its event thread
+            print(f"ERROR: Key handler failed on '{event.name}': {e}")
+
+    def _on_any_key(self, event):
+        if event is self._last_key_hook_event: return # Already delivered by the key hook that installed us
+        self.full_hook_events += 1
+        self.handler(event)
+
+
+if __name__ == "__main__":
+    # Measurement: CPU time our process spends on 10k idle keystrokes (ordinary
+    # typing with an occasional Alt+Tab), full hook vs. trigger-key hooks.
+    # Events are replayed through a stand-in backend that routes them the way
+    # `keyboard` does (key hooks by name, then global hooks); the library's own
+    # per-event bookkeeping, which runs either way, is not included.
+    # Usage: python key_hooks.py [keystrokes]
+    import sys
+    import time
+    from collections import namedtuple
+
+    import main_script
+
+    FakeEvent = namedtuple("FakeEvent", "name event_type time scan_code")
+    KEY_DOWN, KEY_UP = main_script.keyboard.KEY_DOWN, main_script.keyboard.KEY_UP
+    keystrokes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    class ReplayBackend:
+        # Hook bookkeeping as in `keyboard`: one registry keyed by callback, key name
+        # and remove function, so shared callbacks collide here as they do there.
+        def __init__(self):
+            self.key_hooks, self.hooks, self._hooks = {}, [], {}
+
+        def hook(self, callback):
+            self.hooks.append(callback)
+            def remove_():
+                del self._hooks[callback]
+                del self._hooks[remove_]
+                self.hooks.remove(callback)
+            self._hooks[callback] = self._hooks[remove_] = remove_
+            return remove_
+
+        def hook_key(self, key, callback):
+            self.key_hooks.setdefault(key, []).append(callback)
+            def remove_():
+                del self._hooks[callback]
+                del self._hooks[key]
+                del self._hooks[remove_]
+                self.key_hooks[key].remove(callback)
+            self._hooks[callback] = self._hooks[key] = self._hooks[remove_] = remove_
+            return remove_
+
+        def unhook(self, remove):
+            self._hooks[remove]()
+
+        def unhook_all(self): # Like keyboard.unhook_all(): the lists, not the registry
+            self.key_hooks.clear(); del self.hooks[:]
+
+        def route(self, event):
+            for callback in self.key_hooks.get(event.name, ()): callback(event)
+            for callback in list(self.hooks): callback(event)
+
+    def idle_stream():
+        events, now = [], time.time()
+        text = "the quick brown fox jumps over the lazy dog "
+        for i in range(keystrokes):
+            if i % 200 == 199: # Alt+Tab: a chord, so it must not toggle the overlay
+                names = [(main_script.LEFT_ALT_KEY_NAME, KEY_DOWN), ("tab", KEY_DOWN), ("tab", KEY_UP), (main_script.LEFT_ALT_KEY_NAME, KEY_UP)]
+            else:
+                name = "space" if text[i % len(text)] == " " else text[i % len(text)]
+                names = [(name, KEY_DOWN), (name, KEY_UP)]
+            for name, event_type in names:
+                now += 0.05
+                events.append(FakeEvent(name, event_type, now, 0))
+        return events
+
+    def measure(events, hooking):
+        backend = ReplayBackend()
+        main_script.keyboard_hooks = AdaptiveKeyboardHook(main_script.global_key_event_handler, backend)
+        if hooking == "trigger keys":
+            main_script.keyboard_hooks.start()
+            main_script.refresh_keyboard_hooks()
+        elif hooking == "full hook":
+            backend.hook(main_script.global_key_event_handler)
+        start = time.process_time()
+        for event in events:
+            backend.route(event)
+        elapsed = time.process_time() - start
+        assert not main_script.overlay_visible, "Replay toggled the overlay"
+        if hooking == "trigger keys": # Shutdown as main_script does it, in both orders
+            main_script.keyboard_hooks.stop(); assert not backend._hooks, "Key hooks left behind"
+            main_script.keyboard_hooks.start(); backend.unhook_all(); main_script.keyboard_hooks.stop()
+        return elapsed
+
+    events = idle_stream()
+    print(f"--- CPU time per 10k idle keystrokes ({len(events)} events replayed) ---")
+    routing = min(measure(events, "no hooks") for _ in range(5)) # Cost of the replay loop itself
+    for hooking in ("full hook", "trigger keys"):
+        cpu = min(measure(events, hooking) for _ in range(5)) - routing
+        print(f"  {hooking:<13}: {max(cpu, 0.0) * 1000 / keystrokes * 10000:8.2f} ms")
@@ -0,0 +1,155 @@
+# label_trie.py
+
+# --- Variable-length Grid Labels ---
+# Main grid labels are resolved through a prefix trie: each keystroke moves from
+# one node to a child with a single dict lookup, a key with no child rejects
+# the prefix right away, and reaching a node that carries a cell completes the
+# label. For that to work no label may be a prefix of another, which the
+# generator below guarantees for any number of cells.
+from array import array
+from itertools import product
+
+class LabelTrie:
+    """
+    Prefix trie over a label -> cell index map.
+
+    children  -- node -> {char: child node}; node ROOT is the empty prefix
+    cells     -- array('i'), node -> cell index of the label ending there, -1 for inner nodes
+    conflicts -- labels that were skipped because they were a prefix (or an
+                 extension, or a duplicate) of an earlier label
+    """
+    ROOT = 0
+    DEAD = -1
+
+    def __init__(self, label_to_cell):
+        self.children = [{}]
+        cells = [-1]
+        self.conflicts = []
+        for label, cell in label_to_cell.items():
+            node, path = self.ROOT, []
+            for char in label:
+                if cells[node] != -1: break # An earlier label ends here: this one extends it
+                child = self.children[node].get(char)
+                if child is None:
+                    child = len(self.children)
+                    self.children.append({}); cells.append(-1)
+                    path.append((node, char))
+                    self.children[node][char] = child
+                node = child
+            else:
+                if label and cells[node] == -1 and not self.children[node]:
+                    cells[node] = cell
+                    continue
+            self.conflicts.append(label)
+            for parent, char in reversed(path): # Drop the nodes this label added
+                del self.children[parent][char]
+            del self.children[len(self.children) - len(path):], cells[len(cells) - len(path):]
+        self.cells = array("i", cells)
+        self.label_count = len(label_to_cell) - len(self.conflicts)
+
+    def advance(self, node, char):
+        """Child of `node` for `char`, or DEAD if no label continues that way."""
+        return self.children[node].get(char, self.DEAD)
+
+    def cell(self, node):
+        """Cell index of the label ending at `node`, or -1 if more keys are needed."""
+        return self.cells[node]
+
+    def resolve(self, label):
+        """Cell index for a whole label, or -1."""
+        node = self.ROOT
+        for char in label:
+            node = self.children[node].get(char, self.DEAD)
+            if node == self.DEAD: return -1
+        return self.cells[node]
+
+    def __len__(self):
+        return len(self.children)
+
+    def to_arrays(self):
+        """
+        The trie as flat arrays (for layout_cache.py): node n's edges are
+        edge_chars / edge_children[offsets[n]:offsets[n + 1]], as code points and child nodes.
+        """
+        offsets, edge_chars, edge_children = array("i", [0]), array("i"), array("i")
+        for edges in self.children:
+            edge_chars.extend(map(ord, edges))
+            edge_children.extend(edges.values())
+            offsets.append(len(edge_chars))
+        return {"offsets": offsets, "edge_chars": edge_chars, "edge_children": edge_children,
+                "cells": self.cells, "conflicts": self.conflicts}
+
+    @classmethod
+    def from_arrays(cls, offsets, edge_chars, edge_children, cells, conflicts=()):
+        """Rebuilds a trie from to_arrays() output (arrays or memoryviews) without re-checking the labels."""
+        trie = cls.__new__(cls)
+        chars = "".join(map(chr, edge_chars))
+        children = edge_children.tolist()
+        trie.children = [dict(zip(chars[start:end], children[start:end])) for start, end in zip(offsets, offsets[1:])]
+        trie.cells = cells
+        trie.conflicts = list(conflicts)
+        trie.label_count = sum(1 for cell in cells if cell != -1)
+        return trie
+
+
+def generate_prefix_free_labels(count, alphabet, length=0):
+    """
+    `count` labels over `alphabet` of which none is a prefix of another.
+
+    length=0 keeps labels as short as possible: the shortest pending label is
+    repeatedly replaced by its extensions with every character (as link-hint
+    tools do), so lengths differ by at most one and short labels come first.
+    length=n makes every label exactly n characters long.
+    """
+    alphabet = "".join(dict.fromkeys(alphabet)) # Drop repeated characters, keep order
+    if count <= 0: return []
+    if len(alphabet) < 2: raise ValueError("A label alphabet needs at least two distinct characters")
+    if length:
+        if len(alphabet) ** length < count:
+            raise ValueError(f"{len(alphabet)} characters give only {len(alphabet) ** length} labels of length {length}, {count} needed")
+        labels = []
+        for chars in product(alphabet, repeat=length):
+            labels.append("".join(chars))
+            if len(labels) == count: break
+        return labels
+    labels, offset = [""], 0
+    while len(labels) - offset < count or offset == 0:
+        prefix = labels[offset]; offset += 1
+        labels.extend(prefix + char for char in alphabet)
+    return labels[offset:offset + count]
+
+def generate_grid_key_map(cols, rows, alphabet, length=0):
+    """Key map ("label": (row, col)) with generated labels, assigned row by row."""
+    labels = generate_prefix_free_labels(cols * rows, alphabet, length)
+    return {label: divmod(index, cols) for index, label in enumerate(labels)}
+
+
+if __name__ == "__main__":
+    # Benchmark: label generation, trie construction and per-keystroke advance
+    # for grids well beyond the 900 cells of the two-character pattern.
+    # Usage: python label_trie.py
+    import time
+
+    alphabet = "QWERTASDFGZXCVBYUIOPHJKL;NM,./"
+    for cols, rows, length in ((25, 36, 0), (120, 90, 0), (120, 90, 3), (320, 180, 0), (320, 180, 4)):
+        start = time.perf_counter()
+        key_map = generate_grid_key_map(cols, rows, alphabet, length)
+        generated = time.perf_counter() - start
+        start = time.perf_counter()
+        trie = LabelTrie({label: r * cols + c for label, (r, c) in key_map.items()})
+        built = time.perf_counter() - start
+        assert not trie.conflicts
+
+        keystrokes = 0
+        start = time.perf_counter()
+        for label in key_map:
+            node = LabelTrie.ROOT
+            for char in label:
+                node = trie.advance(node, char); keystrokes += 1
+            assert trie.cell(node) != -1
+        advanced = time.perf_counter() - start
+
+        lengths = sorted({len(label) for label in key_map})
+        print(f"{cols}x{rows} ({cols * rows} cells, label length {'/'.join(map(str, lengths))}): "
+              f"generate {generated * 1000:.1f} ms, trie {built * 1000:.1f} ms ({len(trie)} nodes), "
+              f"advance {advanced / keystrokes * 1e9:.0f} ns/keystroke")
@@ -0,0 +1,199 @@
+# layout_cache.py
+
+# --- Compiled Layout Cache ---
+# Compiling the grids (key maps, label trie, cell geometry, click targets and
+# label font sizes) grows with the grid size and the number of monitors: a
+# 320x180 grid has 1.4 million click targets per monitor. The compiled arrays
+# are therefore stored in the user cache directory as one flat binary file per
+# artifact and memory-mapped on later launches, so a cache hit costs a file
+# open and a header parse; the arrays are read in place.
+#
+# A file name is a hash of everything the artifact is derived from: the source
+# of the config modules (or their settings where no source is readable, as in
+# frozen builds), the source of the compiling modules and of the caller's build
+# functions, and whatever the caller adds (e.g. monitor size). Anything changing
+# gives a new name. Storing an artifact deletes the other files of its kind
+# except those for the keys still in use (one per monitor size), so the cache
+# directory holds the current layouts only. LAYOUT_FORMAT_VERSION changes only
+# with the file layout below.
+#
+# File layout (little-endian): magic, format version, section count, then per
+# section (name, typecode, offset, byte length), then the 8-byte aligned data.
+# Typecodes are array typecodes, plus "s" for a list of str stored as UTF-8
+# joined by NUL characters.
+import glob
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from cache_paths import get_cache_dir
+
+LAYOUT_CACHE_SUBDIR = "layouts"
+LAYOUT_FORMAT_VERSION = 1 # Bump when a section's meaning changes
+MAGIC = b"MLLC"
+HEADER = struct.Struct("<4sII") # magic, version, section count
+SECTION = struct.Struct("<32s4sQQ") # name, typecode, offset, byte length
+
+def module_fingerprint(module_name):
+    """Bytes identifying a module's current content: its source, else its upper-case settings."""
+    module = sys.modules.get(module_name)
+    if module is None:
+        try:
+            module = __import__(module_name)
+        except ImportError:
+            return b"<missing>"
+    try:
+        with open(module.__file__, "rb") as source:
+            return source.read()
+    except (AttributeError, TypeError, OSError): # Frozen build: no source files next to the modules
+        return repr(sorted((name, getattr(module, name)) for name in dir(module) if name.isupper())).encode()
+
+def function_fingerprint(function):
+    """
+    Bytes identifying a top-level function's current content: its source lines
+    (up to the next unindented line), else its bytecode. Cheaper than inspect.getsource().
+    """
+    code = function.__code__
+    try:
+        with open(code.co_filename, "rb") as source:
+            lines = source.read().splitlines()[code.co_firstlineno - 1:]
+    except (OSError, TypeError):
+        return marshal.dumps(code)
+    end = next((number for number, line in enumerate(lines[1:], 1) if line[:1] not in (b"", b" ", b"\t", b"#")), len(lines))
+    return b"\n".join(lines[:end])
+
+def layout_cache_key(module_names, *extra, functions=()):
+    """Hex digest over the named modules' and `functions`' fingerprints and `extra` (anything with a stable repr)."""
+    hasher = hashlib.sha1(repr((LAYOUT_FORMAT_VERSION, tuple(module_names), extra)).encode())
+    for module_name in module_names:
+        hasher.update(hashlib.sha1(module_fingerprint(module_name)).digest())
+    for function in functions:
+        hasher.update(hashlib.sha1(function_fingerprint(function)).digest())
+    return hasher.hexdigest()
+
+
+def write_sections(path, sections):
+    """Writes {name: array | list of str} atomically (a concurrent launch never sees half a file)."""
+    payloads = []
+    for name, value in sections.items():
+        if isinstance(value, array): payloads.append((name, value.typecode, value.tobytes()))
+        else: payloads.append((name, "s", "\0".join(value).encode("utf-8")))
+    offset = HEADER.size + SECTION.size * len(payloads)
+    table, chunks = [], []
+    for name, typecode, data in payloads:
+        offset += -offset % 8
+        table.append(SECTION.pack(name.encode(), typecode.encode(), offset, len(data)))
+        chunks.append((offset, data))
+        offset += len(data)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, LAYOUT_FORMAT_VERSION, len(payloads)))
+        out.write(b"".join(table))
+        for chunk_offset, data in chunks:
+            out.write(b"\0" * (chunk_offset - out.tell()))
+            out.write(data)
+    os.replace(tmp_path, path)
+
+def read_sections(path):
+    """
+    Memory-maps a file from write_sections(). Returns {name: memoryview | list of str};
+    numeric sections are memoryviews cast to their typecode, backed by the mapping.
+    Raises ValueError for a file that is not a complete cache file of this format.
+    """
+    with open(path, "rb") as source:
+        mapping = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    magic, version, count = HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != LAYOUT_FORMAT_VERSION: raise ValueError(f"{path} is not a layout cache file of version {LAYOUT_FORMAT_VERSION}")
+    sections = {}
+    for number in range(count):
+        name, typecode, offset, length = SECTION.unpack_from(view, HEADER.size + SECTION.size * number)
+        name, typecode = name.rstrip(b"\0").decode(), typecode.rstrip(b"\0").decode()
+        if offset + length > len(view): raise ValueError(f"{path} is truncated")
+        data = view[offset:offset + length]
+        if typecode == "s": sections[name] = bytes(data).decode("utf-8").split("\0") if length else []
+        else: sections[name] = data.cast(typecode)
+    return sections
+
+def remove_stale(kind, keep_keys):
+    """Deletes the `kind` cache files (and leftover temporary files) whose key is not in `keep_keys`."""
+    directory = get_cache_dir(LAYOUT_CACHE_SUBDIR)
+    keep = {os.path.join(directory, f"{kind}_{key}.bin") for key in keep_keys}
+    for path in glob.glob(os.path.join(directory, f"{kind}_*.bin")) + glob.glob(os.path.join(directory, f"{kind}_*.tmp")):
+        if path in keep: continue
+        if path.endswith(".tmp") and path.endswith(f".{os.getpid()}.tmp"): continue # Being written by this process
+        try:
+            os.remove(path) # On Windows a file another running instance still maps cannot be removed; the next write retries
+        except OSError:
+            pass
+
+def load_or_build(kind, cache_key, build, keep_keys=()):
+    """
+    Sections of the `kind` artifact for `cache_key`: memory-mapped from the cache
+    if present, else `build()`'s {name: array | list of str}, which is then stored
+    and the other `kind` files not listed in `keep_keys` are deleted (`keep_keys`
+    is only iterated then, so it may be a generator).
+    Returns (sections, from_cache). Cache I/O problems only cost the rebuild.
+    """
+    try:
+        path = os.path.join(get_cache_dir(LAYOUT_CACHE_SUBDIR), f"{kind}_{cache_key}.bin")
+    except OSError as e:
+        print(f"WARNING: Layout cache unavailable ({e}); compiling.")
+        return build(), False
+    if os.path.exists(path):
+        try:
+            return read_sections(path), True
+        except (OSError, ValueError, struct.error) as e:
+            print(f"WARNING: Ignoring unreadable layout cache file {path}: {e}")
+    sections = build()
+    try:
+        write_sections(path, sections)
+        remove_stale(kind, {cache_key, *keep_keys})
+    except OSError as e:
+        print(f"WARNING: Could not write the layout cache file {path}: {e}")
+    return sections, False
+
+
+if __name__ == "__main__":
+    # Benchmark: compile vs. cache hit for the main grid, label trie and click
+    # targets of one monitor, at the configured and at larger grid sizes.
+    # Usage: python layout_cache.py
+    import tempfile
+    import time
+
+    from grid_layout import GridLayout, ClickTargets, compile_main_layout, compile_sub_layout
+    from label_trie import LabelTrie, generate_grid_key_map
+    from key_config import SUB_GRID_COLS, SUB_GRID_ROWS, get_sub_grid_key_map
+
+    sub_key_map = get_sub_grid_key_map()
+    with tempfile.TemporaryDirectory() as directory:
+        for cols, rows in ((25, 36), (120, 90), (320, 180)):
+            path = os.path.join(directory, f"bench_{cols}x{rows}.bin")
+            start = time.perf_counter()
+            key_map = generate_grid_key_map(cols, rows, "QWERTASDFGZXCVBYUIOPHJKL;NM,./")
+            main_layout = compile_main_layout(key_map, cols, rows, 3840, 2160)
+            sub_layout = compile_sub_layout(sub_key_map, SUB_GRID_COLS, SUB_GRID_ROWS, main_layout.cell_width, main_layout.cell_height)
+            trie = LabelTrie(main_layout.key_to_index)
+            targets = ClickTargets(main_layout, sub_layout)
+            compiled = time.perf_counter() - start
+
+            sections = {"labels": main_layout.labels, "rects": main_layout.rects, "centers": main_layout.centers,
+                        "points": targets.points, **{f"trie_{name}": data for name, data in trie.to_arrays().items()}}
+            write_sections(path, sections)
+            start = time.perf_counter()
+            loaded = read_sections(path)
+            cached_layout = GridLayout.from_arrays(cols, rows, 0, 0, 3840, 2160, loaded["labels"], loaded["rects"], loaded["centers"])
+            cached_trie = LabelTrie.from_arrays(**{name[5:]: data for name, data in loaded.items() if name.startswith("trie_")})
+            cached_targets = ClickTargets.from_points(len(main_layout), len(sub_layout), loaded["points"])
+            hit = time.perf_counter() - start
+
+            label = next(iter(key_map))
+            assert cached_trie.resolve(label) == trie.resolve(label) == cached_layout.index_of(label)
+            assert cached_targets.target(len(main_layout) - 1, 0) == targets.target(len(main_layout) - 1, 0)
+            print(f"{cols}x{rows}: compile {compiled * 1000:7.1f} ms, cache hit {hit * 1000:6.1f} ms "
+                  f"({os.path.getsize(path) / 1e6:.1f} MB)")
+            del loaded, cached_layout, cached_trie, cached_targets # Release the mapping before the directory goes
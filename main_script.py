@@ -1,20 +1,59 @@
+from startup_profile import StartupProfile
+startup_profile = StartupProfile() # Before the other imports, so the first phase covers them
+import sys # For sys.exit()
+
+# --- Command Line and Single Instance ---
+# Parsed before the heavy imports: while another instance runs, this launch only
+# forwards its command to it and exits (see control_channel.py).
+control_server = None # ControlServer while this process is the instance
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Mouseless: control the mouse with the keyboard.")
+    parser.add_argument("command", nargs="*",
+                        help="command for the running instance, e.g. show, hide, free-mode, click AB/K, reload-config, "
+                             "stats, quit ('help' lists them); run after start-up if Mouseless is not running yet")
+    parser.add_argument("--startup-check", action="store_true",
+                        help="start up, print the startup phase report and exit (status 1 if over the startup budget)")
+    parser.add_argument("--startup-budget", type=float, default=None, metavar="MS",
+                        help="startup time budget in milliseconds, 0 for none (default: STARTUP_BUDGET_MS)")
+    args = parser.parse_args()
+    if not args.startup_check: # The check may run next to a running instance
+        from control_channel import ControlServer, forward_command_line
+        control_server = ControlServer()
+        if not control_server.claim(): sys.exit(forward_command_line(args.command))
+
 import tkinter as tk
 import keyboard
-import pyautogui
 import time
-from screeninfo import get_monitors
+import os
+from array import array
 import threading # For running pystray in a separate thread
-import sys # For sys.exit()
+from grid_render import draw_grid_lines, label_font_size, get_label_font, clear_label_fonts
+from grid_layout import GridLayout, ClickTargets, compile_main_layout, compile_sub_layout, cell_labels
+from layout_cache import load_or_build, layout_cache_key
+from label_trie import LabelTrie
+from overlay_platform import set_click_through, get_focused_window, restore_focused_window, enable_dpi_awareness, monitor_dpi
+from monitor_model import Monitor, MonitorModel, read_monitors
+from monitor_watch import MonitorWatcher
+from pointer_backend import get_pointer_backend
+from action_queue import ActionExecutor, format_stats
+from ui_dispatch import UiCommandChannel
+from key_dispatch import KeyDispatchTable, DISPATCH_MODES
+from key_hooks import AdaptiveKeyboardHook
+from free_mode_motion import MotionEngine, ScrollEngine
+from modifier_state import ModifierState, MODIFIER_KEY_BITS, compile_click_buttons
+from control_channel import run_command
 
 # System Tray Icon
-try:
-    from PIL import Image # Pillow, for loading the icon image
-    import pystray
-    PYSTRAY_AVAILABLE = True
-except ImportError:
-    PYSTRAY_AVAILABLE = False
+# pystray and Pillow are only looked up here; setup_tray_icon() imports them on the tray thread.
+# (pyautogui, which pulls in Pillow and half a dozen helpers, is likewise only imported when
+# POINTER_BACKEND = "pyautogui" or screeninfo fails.)
+from importlib.util import find_spec
+PYSTRAY_AVAILABLE = find_spec("pystray") is not None and find_spec("PIL") is not None
+if not PYSTRAY_AVAILABLE:
     print("WARNING: pystray or Pillow not installed. System tray icon feature will be disabled.")
     print("To enable, run: pip install pystray Pillow")
+startup_profile.mark("imports")
 
 # --- CONFIG IMPORTS (key_config, style_config, feature_config) ---
 # (Keep these sections as they were in the previous version)
@@ -36,9 +75,10 @@ except ImportError:
 try:
     from style_config import (
         OVERLAY_ALPHA, OVERLAY_BACKGROUND_COLOR,
-        GRID_COLOR, GRID_LINE_WIDTH, GRID_LINE_STYLE,
+        GRID_COLOR, GRID_LINE_WIDTH, GRID_LINE_STYLE, GRID_RENDER_MODE,
         SUB_GRID_HIGHLIGHT_COLOR, SUB_GRID_HIGHLIGHT_WIDTH,
         TEXT_COLOR, FONT_FAMILY, FONT_SIZE_BEHAVIOR, FONT_FIXED_SIZE, FONT_WEIGHT,
+        LABEL_FILTER_BEHAVIOR, LABEL_FILTER_DIM_COLOR, LABEL_FILTER_MATCH_COLOR,
         DOUBLE_CLICK_INTERVAL, LEFT_ALT_KEY_NAME,
         validate_configs
     )
@@ -48,9 +88,11 @@ except ImportError:
     print("ERROR: Could not import from style_config.py. Using default styles.")
     OVERLAY_ALPHA, OVERLAY_BACKGROUND_COLOR = 0.5, "black"
     GRID_COLOR, GRID_LINE_WIDTH, GRID_LINE_STYLE = "white", 1, "line"
+    GRID_RENDER_MODE = "canvas"
     SUB_GRID_HIGHLIGHT_COLOR, SUB_GRID_HIGHLIGHT_WIDTH = "lime", 3
     TEXT_COLOR, FONT_FAMILY, FONT_SIZE_BEHAVIOR = "white", "Arial", "dynamic"
     FONT_FIXED_SIZE, FONT_WEIGHT = 10, "normal"
+    LABEL_FILTER_BEHAVIOR, LABEL_FILTER_DIM_COLOR, LABEL_FILTER_MATCH_COLOR = "dim", "gray30", "yellow"
     DOUBLE_CLICK_INTERVAL, LEFT_ALT_KEY_NAME = 0.35, 'alt'
 
 # Import from your feature configuration file
@@ -59,7 +101,13 @@ try:
         ENABLE_FREE_MODE, FREE_MODE_TOGGLE_KEY,
         MOUSE_MOVE_STEP, SCROLL_STEP,
         FREE_MODE_MOUSE_UP, FREE_MODE_MOUSE_DOWN, FREE_MODE_MOUSE_LEFT, FREE_MODE_MOUSE_RIGHT,
-        FREE_MODE_SCROLL_UP, FREE_MODE_SCROLL_DOWN, FREE_MODE_SCROLL_LEFT, FREE_MODE_SCROLL_RIGHT
+        FREE_MODE_SCROLL_UP, FREE_MODE_SCROLL_DOWN, FREE_MODE_SCROLL_LEFT, FREE_MODE_SCROLL_RIGHT,
+        FREE_MODE_CONTINUOUS_MOTION, FREE_MODE_TICK_HZ, FREE_MODE_BASE_SPEED, FREE_MODE_ACCELERATION, FREE_MODE_MAX_SPEED,
+        FREE_MODE_SMOOTH_SCROLL, FREE_MODE_SCROLL_HIGH_RESOLUTION, FREE_MODE_SCROLL_BASE_SPEED,
+        FREE_MODE_SCROLL_ACCELERATION, FREE_MODE_SCROLL_MAX_SPEED, FREE_MODE_SCROLL_MOMENTUM,
+        CLICK_MODIFIER_BUTTONS,
+        OVERLAY_WARM_MODE, OVERLAY_CLICK_THROUGH, OVERLAY_UNMAP_TIMEOUT, REPORT_OVERLAY_LATENCY,
+        WATCH_MONITOR_CHANGES, STARTUP_BUDGET_MS, USE_LAYOUT_CACHE, POINTER_BACKEND, ACTION_QUEUE_SIZE, UI_FRAME_INTERVAL_MS
     )
 except ImportError:
     print("INFO: Could not import from feature_config.py. Free Mode will be disabled.")
@@ -68,19 +116,30 @@ except ImportError:
     MOUSE_MOVE_STEP, SCROLL_STEP = 20, 3
     FREE_MODE_MOUSE_UP, FREE_MODE_MOUSE_DOWN, FREE_MODE_MOUSE_LEFT, FREE_MODE_MOUSE_RIGHT = 'i','k','j','l'
     FREE_MODE_SCROLL_UP, FREE_MODE_SCROLL_DOWN, FREE_MODE_SCROLL_LEFT, FREE_MODE_SCROLL_RIGHT = 'm',',','b','n'
+    FREE_MODE_CONTINUOUS_MOTION, FREE_MODE_TICK_HZ = False, 120
+    FREE_MODE_BASE_SPEED, FREE_MODE_ACCELERATION, FREE_MODE_MAX_SPEED = 400, 1800, 2400
+    FREE_MODE_SMOOTH_SCROLL, FREE_MODE_SCROLL_HIGH_RESOLUTION = False, True
+    FREE_MODE_SCROLL_BASE_SPEED, FREE_MODE_SCROLL_ACCELERATION, FREE_MODE_SCROLL_MAX_SPEED, FREE_MODE_SCROLL_MOMENTUM = 8, 24, 40, 0.15
+    CLICK_MODIFIER_BUTTONS = {"shift": "right"}
+    OVERLAY_WARM_MODE, OVERLAY_CLICK_THROUGH, OVERLAY_UNMAP_TIMEOUT, REPORT_OVERLAY_LATENCY = False, False, 0.1, False
+    WATCH_MONITOR_CHANGES, STARTUP_BUDGET_MS, USE_LAYOUT_CACHE = True, 1000, True
+    POINTER_BACKEND, ACTION_QUEUE_SIZE, UI_FRAME_INTERVAL_MS = "auto", 64, 16
 
 
 # --- Load Key Maps ---
-main_grid_key_map = get_main_grid_key_map()
-sub_grid_key_map = get_sub_grid_key_map()
+# Loaded by compile_layouts(), from the compiled layout cache when it is current.
+main_grid_key_map = {}
+sub_grid_key_map = {}
+startup_profile.mark("config")
 
 # --- Global State ---
-overlay_window = None
-canvas = None
+overlay_root = None # Hidden Tk root: runs the mainloop and owns one overlay window per monitor
 overlay_visible = False
 current_mode = "main"
-first_char_main = None
-selected_main_cell_rect = None
+main_label_node = LabelTrie.ROOT # Position in main_label_trie of the keys typed so far
+main_label_prefix = "" # Those keys, for the label filter
+selected_main_index = -1 # Main cell whose sub-grid is shown
+active_monitor_index = 0 # Index into monitor_overlays of the monitor the overlay is shown on
 
 g_left_alt_down_for_toggle = False
 g_left_alt_press_timestamp = 0
@@ -91,23 +150,196 @@ pending_double_click_info = {
 }
 _suppressed_keys_in_overlay = set()
 
+MAIN_GRID_TAG = "main_grid" # Canvas tag grouping every item of the retained main grid
+SUB_GRID_TAG = "sub_grid" # Canvas tag of the sub-grid layer drawn over the (hidden) main grid
+MAIN_LABEL_TAG = "main_label" # Tag of every main grid label; each also carries one tag per proper prefix (label_prefix_tag)
+shown_overlay = None # MonitorOverlay currently presented (mapped, or alpha > 0 in warm mode); Tk thread only
+mapped_overlays = set() # MonitorOverlays whose window is mapped; Tk thread only
+overlay_click_through = False # OVERLAY_CLICK_THROUGH is on *and* the platform applied it
+overlay_unmapped = threading.Event() # Set while no overlay window can receive the pointer (unmapped / warm-hidden)
+overlay_unmapped.set()
+focus_before_overlay = None # Window that had focus before a warm-mode overlay took it
+overlay_latency_started_at = None # perf_counter() of the pending Alt toggle when REPORT_OVERLAY_LATENCY is on
+overlay_latency_samples = []
+
 free_mode_active = False
 tray_icon_object = None # Will hold the pystray.Icon object
+startup_reported = threading.Event() # Set once the startup phase report is out (after the tray icon is up)
 app_is_exiting = False # Flag to signal threads to stop
 
-# --- Screen Dimensions ---
-try:
-    PRIMARY_MONITOR = get_monitors()[0]
-    SCREEN_WIDTH, SCREEN_HEIGHT = PRIMARY_MONITOR.width, PRIMARY_MONITOR.height
-except Exception:
-    print("WARNING: screeninfo failed, falling back to pyautogui for screen size.")
-    SCREEN_WIDTH, SCREEN_HEIGHT = pyautogui.size()
+# --- Monitors ---
+# Per-monitor DPI awareness first, so every monitor reports physical pixels (see
+# monitor_model.py). The model is read once here and re-read only when the
+# window system reports a monitor change (see monitor_watch.py).
+enable_dpi_awareness()
+
+def read_monitor_set():
+    try:
+        return read_monitors(dpi_for=monitor_dpi)
+    except Exception:
+        print("WARNING: screeninfo failed, falling back to pyautogui for screen size (primary monitor only).")
+        import pyautogui
+        width, height = pyautogui.size()
+        return (Monitor(0, "Screen", 0, 0, width, height, True, None),)
+
+monitor_model = MonitorModel(read_monitor_set)
+monitor_model.refresh()
+PRIMARY_MONITOR = monitor_model.primary()
+startup_profile.mark("monitors")
+
+# --- Pointer Backend ---
+# Moves, clicks and scrolls go through pointer_backend.py, which injects them
+# directly instead of paying pyautogui's per-call PAUSE.
+pointer = get_pointer_backend(POINTER_BACKEND)
+
+# --- Pointer Action Executor ---
+# The keyboard hook only classifies events and submits (kind, *args) records;
+# the executor thread performs them in order (see action_queue.py).
+def execute_click_action(x, y, button, wait_for_hide):
+    if wait_for_hide: wait_for_overlay_unmapped()
+    pointer.click(x, y, button=button)
+    print(f"Clicked (Grid Action) {button} at ({x}, {y})")
+
+action_executor = ActionExecutor({
+    "click": execute_click_action,
+    "move": pointer.move_relative,
+    "scroll": pointer.scroll,
+    "hscroll": pointer.hscroll,
+}, maxsize=ACTION_QUEUE_SIZE)
+
+# --- Free Mode Motion ---
+# Held movement and scroll keys drive fixed-rate engine threads; their moves and
+# wheel deltas go through the executor like every other pointer action (see free_mode_motion.py).
+motion_engine = MotionEngine(lambda dx, dy: action_executor.submit_delta("move", dx, dy), tick_hz=FREE_MODE_TICK_HZ,
+                             base_speed=FREE_MODE_BASE_SPEED, acceleration=FREE_MODE_ACCELERATION, max_speed=FREE_MODE_MAX_SPEED)
+scroll_engine = ScrollEngine(lambda units: action_executor.submit_delta("scroll", units), lambda units: action_executor.submit_delta("hscroll", units),
+                             pointer.wheel_units_per_notch, tick_hz=FREE_MODE_TICK_HZ, high_resolution=FREE_MODE_SCROLL_HIGH_RESOLUTION,
+                             base_speed=FREE_MODE_SCROLL_BASE_SPEED, acceleration=FREE_MODE_SCROLL_ACCELERATION,
+                             max_speed=FREE_MODE_SCROLL_MAX_SPEED, momentum=FREE_MODE_SCROLL_MOMENTUM)
+
+# --- Compiled Layouts ---
+# Built from the key maps: once for the grid (labels, label trie) and once per
+# monitor size (cell geometry, click targets, label font sizes). Drawing and
+# keystroke resolution only do lookups into them (see grid_layout.py). Layouts
+# are window-local; click targets add the monitor's origin. Every monitor uses
+# the same key map, so one label trie serves them all.
+# Compiled arrays are cached on disk, keyed by the config and compiler sources,
+# the build_*_sections() functions below and the monitor size, and memory-mapped
+# on later launches (see layout_cache.py).
+LAYOUT_SOURCE_MODULES = ("key_config", "style_config", "grid_layout", "label_trie", "grid_render", "layout_cache")
+
+def layout_key(build, args):
+    return layout_cache_key(LAYOUT_SOURCE_MODULES, MAIN_GRID_COLS, MAIN_GRID_ROWS, SUB_GRID_COLS, SUB_GRID_ROWS, *args, functions=(build,))
+
+def load_or_build_layout(kind, build, args=(), live_args=()):
+    """
+    (sections, from_cache) of build(*args); see layout_cache.load_or_build().
+    live_args -- the `args` of the other artifacts of this kind in use, whose files the cache keeps
+    """
+    if not USE_LAYOUT_CACHE: return build(*args), False
+    return load_or_build(kind, layout_key(build, args), lambda: build(*args), (layout_key(build, other) for other in live_args))
+
+def build_grid_sections():
+    main_labels = cell_labels(get_main_grid_key_map(), MAIN_GRID_COLS, MAIN_GRID_ROWS)
+    sub_labels = cell_labels(get_sub_grid_key_map(), SUB_GRID_COLS, SUB_GRID_ROWS)
+    trie = LabelTrie({label: index for index, label in enumerate(main_labels) if label})
+    return {"main_labels": main_labels, "sub_labels": sub_labels,
+            **{f"trie_{name}": data for name, data in trie.to_arrays().items()}}
+
+def build_monitor_sections(width, height, font_scale):
+    main_layout = compile_main_layout(main_grid_key_map, MAIN_GRID_COLS, MAIN_GRID_ROWS, width, height)
+    sub_layout = compile_sub_layout(sub_grid_key_map, SUB_GRID_COLS, SUB_GRID_ROWS, main_layout.cell_width, main_layout.cell_height)
+    fixed_font_size = max(1, round(FONT_FIXED_SIZE * font_scale))
+    font_sizes = array("i", (label_font_size(main_layout.cell_width, main_layout.cell_height, label, FONT_SIZE_BEHAVIOR, fixed_font_size)
+                             for label in main_layout.labels))
+    return {"main_rects": main_layout.rects, "main_centers": main_layout.centers,
+            "sub_rects": sub_layout.rects, "sub_centers": sub_layout.centers,
+            "click_points": ClickTargets(main_layout, sub_layout).points, "main_font_sizes": font_sizes}
+
+class MonitorOverlay:
+    """One monitor's overlay: its compiled layouts and click targets, and (on the Tk thread) its window and layers."""
+
+    def __init__(self, monitor, font_scale=1.0, live_args=()):
+        self.monitor = monitor
+        self.font_scale = font_scale # FONT_FIXED_SIZE multiplier: this monitor's DPI relative to the primary's
+        width, height = monitor.width, monitor.height
+        sections, self.from_cache = load_or_build_layout("monitor", build_monitor_sections, (width, height, font_scale), live_args)
+        self.main_layout = GridLayout.from_arrays(MAIN_GRID_COLS, MAIN_GRID_ROWS, 0, 0, width, height, main_grid_labels,
+                                                  sections["main_rects"], sections["main_centers"], main_label_to_index, main_grid_key_map)
+        self.sub_layout = GridLayout.from_arrays(SUB_GRID_COLS, SUB_GRID_ROWS, 0, 0, self.main_layout.cell_width, self.main_layout.cell_height,
+                                                 sub_grid_labels, sections["sub_rects"], sections["sub_centers"], key_map=sub_grid_key_map)
+        self.click_targets = ClickTargets.from_points(len(self.main_layout), len(self.sub_layout), sections["click_points"], monitor.x, monitor.y)
+        self.main_font_sizes = sections["main_font_sizes"] # Per main cell, as label_font_size() gives them
+        self.window = None
+        self.canvas = None
+        self.layer_signature = None # Signature the main grid layer was last built with (None = needs build)
+        self.photo = None # tk.PhotoImage backing the main grid in "bitmap" render mode (Tk needs a live reference)
+        self.presented = False # Window currently visible (mapped, or alpha > 0 in warm mode)
+
+monitor_overlays = []
+main_label_trie = None
+main_grid_labels = sub_grid_labels = () # Flat cell index -> label
+main_label_to_index = {}
+
+def compile_monitor_overlays(previous=()):
+    """
+    A MonitorOverlay per monitor in monitor_model. Overlays in `previous` whose
+    monitor kept its geometry are reused, with their compiled layouts and windows.
+    """
+    primary_scale = monitor_model.primary().scale
+    reusable = {(o.monitor.x, o.monitor.y, o.monitor.width, o.monitor.height, o.font_scale): o for o in previous}
+    live_args = [(monitor.width, monitor.height, monitor.scale / primary_scale) for monitor in monitor_model.monitors]
+    overlays = []
+    for monitor in monitor_model.monitors:
+        font_scale = monitor.scale / primary_scale
+        overlay = reusable.pop((monitor.x, monitor.y, monitor.width, monitor.height, font_scale), None)
+        if overlay: overlay.monitor = monitor # Same geometry, possibly a new number
+        else: overlay = MonitorOverlay(monitor, font_scale, live_args)
+        overlays.append(overlay)
+    return overlays
+
+def compile_layouts():
+    global monitor_overlays, main_label_trie, active_monitor_index
+    global main_grid_key_map, sub_grid_key_map, main_grid_labels, sub_grid_labels, main_label_to_index
+    sections, from_cache = load_or_build_layout("grid", build_grid_sections)
+    main_grid_labels, sub_grid_labels = sections["main_labels"], sections["sub_labels"]
+    main_label_to_index = {label: index for index, label in enumerate(main_grid_labels) if label}
+    main_grid_key_map = {label: divmod(index, MAIN_GRID_COLS) for label, index in main_label_to_index.items()}
+    sub_grid_key_map = {label: divmod(index, SUB_GRID_COLS) for index, label in enumerate(sub_grid_labels) if label}
+    main_label_trie = LabelTrie.from_arrays(**{name[len("trie_"):]: data for name, data in sections.items() if name.startswith("trie_")})
+    monitor_overlays = compile_monitor_overlays()
+    active_monitor_index = PRIMARY_MONITOR.index
+    cached = (1 if from_cache else 0) + sum(1 for overlay in monitor_overlays if overlay.from_cache)
+    print(f"Compiled layouts: {cached} of {len(monitor_overlays) + 1} loaded from the layout cache.")
+    for label in main_label_trie.conflicts[:5]:
+        print(f"WARNING: Main grid label '{label}' ignored: it is a prefix of, extends or repeats another label.")
+
+compile_layouts()
+startup_profile.mark("layouts")
+
+def on_monitors_changed():
+    """Runs on the monitor watcher's thread: recompiles the overlays of changed monitors; the Tk thread swaps their windows."""
+    global monitor_overlays, active_monitor_index, PRIMARY_MONITOR
+    if not monitor_model.refresh(): return # A notification without a geometry change (e.g. a mode set back)
+    previous = monitor_overlays
+    overlays = compile_monitor_overlays(previous)
+    if overlay_visible: hide_overlay(restore_focus=False) # Its monitor may be gone; the next toggle opens on the new setup
+    PRIMARY_MONITOR = monitor_model.primary()
+    monitor_overlays = overlays; active_monitor_index = PRIMARY_MONITOR.index
+    ui_commands.post("monitors", tuple(previous))
+    rebuilt = sum(1 for overlay in overlays if overlay not in previous)
+    print(f"Monitor setup changed: {len(overlays)} monitor(s), {rebuilt} overlay layout(s) rebuilt.")
+
+monitor_watcher = MonitorWatcher(on_monitors_changed)
 
 
 # --- SYSTEM TRAY FUNCTIONS ---
 def on_quit_callback(icon, item):
+    quit_app("system tray")
+
+def quit_app(source):
     global app_is_exiting, tray_icon_object
-    print("Quit command received from system tray.")
+    print(f"Quit command received from {source}.")
     app_is_exiting = True
     if tray_icon_object:
         tray_icon_object.stop() # Stop the pystray icon's event loop
@@ -115,11 +347,9 @@ def on_quit_callback(icon, item):
     # Perform other cleanup (keyboard, tkinter)
     # This might be better handled in the main finally block,
     # but signaling is important here.
+    keyboard_hooks.stop() # Before unhook_all(), so our hook handles are released cleanly
     keyboard.unhook_all() # Ensure hooks are removed
-    if overlay_window and overlay_window.winfo_exists():
-        # Schedule Tkinter quit from its own thread if possible,
-        # but since tray might be in main thread, direct quit might be needed.
-        overlay_window.quit() # This should break the mainloop
+    ui_commands.post("quit") # The Tk thread breaks its mainloop on the next frame
 
     # sys.exit(0) # This might be too abrupt if Tkinter hasn't quit yet.
                  # The main thread should handle exiting after mainloop breaks.
@@ -128,6 +358,13 @@ def setup_tray_icon():
     global tray_icon_object
     if not PYSTRAY_AVAILABLE:
         return
+    try:
+        from PIL import Image # Pillow, for loading the icon image
+        import pystray
+    except ImportError as e:
+        print(f"WARNING: System tray icon disabled: {e}")
+        finish_startup("tray (failed)")
+        return
 
     icon_image = None
     try:
@@ -151,238 +388,644 @@ def setup_tray_icon():
         menu=menu
     )
     print("System tray icon thread starting...")
-    tray_icon_object.run() # This is a blocking call, so it runs in its own thread
+    tray_icon_object.run(setup=on_tray_icon_ready) # This is a blocking call, so it runs in its own thread
     print("System tray icon thread finished.") # Should only print on explicit stop
 
+def on_tray_icon_ready(icon):
+    icon.visible = True # What pystray does when no setup callback is given
+    finish_startup("tray")
+
+# --- Startup report ---
+def finish_startup(last_phase):
+    """Ends the last startup phase and prints the phase report (once)."""
+    if startup_reported.is_set(): return
+    startup_profile.mark(last_phase)
+    print(startup_profile.format_report(startup_budget_ms))
+    if startup_profile.over_budget(startup_budget_ms):
+        print(f"WARNING: Startup took {startup_profile.total_ms():.0f} ms, over the budget of {startup_budget_ms} ms.")
+    startup_reported.set()
+
+startup_budget_ms = STARTUP_BUDGET_MS # --startup-budget overrides it
+
 
-# --- DRAWING, MOUSE, UI FUNCTIONS (largely unchanged) ---
-# (Copy the draw_grid, draw_main_grid, draw_sub_grid, perform_mouse_click_action,
-#  clear_pending_double_click, create_overlay_window, show_overlay_tk,
-#  hide_overlay_tk, actual_toggle_overlay, toggle_free_mode functions from
-#  the previous version here. They don't need direct changes for the tray icon
-#  itself, but show_overlay_tk and actual_toggle_overlay already handle
-#  free_mode_active state which is good.)
-def draw_grid(cols, rows, width, height, parent_rect_coords=None, is_sub_grid=False):
-    global canvas
+# --- DRAWING, MOUSE, UI FUNCTIONS ---
+def draw_grid(overlay, layout, offset_x=0, offset_y=0, is_sub_grid=False, tags=(), label_tag=None, font_sizes=None):
+    """
+    Draws a compiled layout on `overlay`'s canvas; (offset_x, offset_y) shifts it, e.g. onto the selected main cell.
+    With `label_tag`, every label is also tagged `label_tag` and label_prefix_tag(label_tag, p) for each proper prefix p.
+    `font_sizes` (per cell) saves computing each label's font size.
+    """
+    canvas = overlay.canvas
     if not canvas: return
-    canvas.delete("all")
-    base_x, base_y = (parent_rect_coords[0], parent_rect_coords[1]) if parent_rect_coords else (0, 0)
-    cell_width, cell_height = width / cols, height / rows
-    key_map_to_use = sub_grid_key_map if is_sub_grid else main_grid_key_map
-    cell_to_key_map = {v: k for k, v in key_map_to_use.items()}
-    for r_idx in range(rows):
-        for c_idx in range(cols):
-            x1, y1 = base_x + c_idx * cell_width, base_y + r_idx * cell_height
-            x2, y2 = x1 + cell_width, y1 + cell_height
-            rect_options = {"outline": GRID_COLOR, "width": GRID_LINE_WIDTH}
-            if GRID_LINE_STYLE == "dashes": rect_options["dash"] = (4, 4)
-            canvas.create_rectangle(x1, y1, x2, y2, **rect_options)
-            key_label = cell_to_key_map.get((r_idx, c_idx), "")
-            font_size_to_use = FONT_FIXED_SIZE
-            if FONT_SIZE_BEHAVIOR == "dynamic":
-                font_size_to_use = max(6, min(int(cell_height / 2.5),
-                                           int(cell_width / (len(key_label) + 0.5) * 1.2 if key_label else cell_width / 1.5)))
-            font_tuple = (FONT_FAMILY, font_size_to_use, FONT_WEIGHT)
-            canvas.create_text(x1 + cell_width / 2, y1 + cell_height / 2, text=key_label, fill=TEXT_COLOR, font=font_tuple)
-            if is_sub_grid and r_idx == SUB_GRID_ROWS // 2 and c_idx == SUB_GRID_COLS // 2:
-                canvas.create_rectangle(x1, y1, x2, y2, outline=SUB_GRID_HIGHLIGHT_COLOR, width=SUB_GRID_HIGHLIGHT_WIDTH)
-
-def draw_main_grid():
-    global current_mode
-    current_mode = "main"
-    if canvas: draw_grid(MAIN_GRID_COLS, MAIN_GRID_ROWS, SCREEN_WIDTH, SCREEN_HEIGHT, is_sub_grid=False)
-
-def draw_sub_grid(parent_cell_rect):
-    global selected_main_cell_rect, current_mode
-    current_mode = "sub"; selected_main_cell_rect = parent_cell_rect
-    x1, y1, x2, y2 = parent_cell_rect
-    if canvas: draw_grid(SUB_GRID_COLS, SUB_GRID_ROWS, x2 - x1, y2 - y1, parent_rect_coords=(x1,y1,x2,y2), is_sub_grid=True)
-
-def perform_mouse_click_action(target_x, target_y, is_right_click=False):
-    global overlay_window, overlay_visible, current_mode, first_char_main, _suppressed_keys_in_overlay
-    if overlay_window and overlay_window.winfo_exists() and overlay_window.state() == 'normal':
-        overlay_window.withdraw(); overlay_window.update_idletasks(); time.sleep(0.05)
-    button_to_click = 'right' if is_right_click else 'left'
-    pyautogui.click(x=int(target_x), y=int(target_y), button=button_to_click)
-    print(f"Clicked (Grid Action) {button_to_click} at ({int(target_x)}, {int(target_y)})")
-    overlay_visible = False; current_mode = "main"; first_char_main = None
+    cell_width, cell_height = layout.cell_width, layout.cell_height
+    draw_grid_lines(canvas, layout.x + offset_x, layout.y + offset_y, layout.width, layout.height, layout.cols, layout.rows,
+                    GRID_COLOR, GRID_LINE_WIDTH, GRID_LINE_STYLE, tags)
+    highlight_index = layout.index_at(SUB_GRID_ROWS // 2, SUB_GRID_COLS // 2) if is_sub_grid else -1
+    fixed_font_size = max(1, round(FONT_FIXED_SIZE * overlay.font_scale))
+    rects, labels = layout.rects, layout.labels
+    for index in range(len(layout)):
+        x1, y1 = rects[4 * index] + offset_x, rects[4 * index + 1] + offset_y
+        key_label = labels[index]
+        if font_sizes is not None: font_size_to_use = font_sizes[index]
+        else: font_size_to_use = label_font_size(cell_width, cell_height, key_label, FONT_SIZE_BEHAVIOR, fixed_font_size)
+        label_font = get_label_font(canvas, FONT_FAMILY, font_size_to_use, FONT_WEIGHT)
+        text_tags = tags + (label_tag,) + tuple(label_prefix_tag(label_tag, key_label[:n]) for n in range(1, len(key_label))) if label_tag and key_label else tags
+        canvas.create_text(x1 + cell_width / 2, y1 + cell_height / 2, text=key_label, fill=TEXT_COLOR, font=label_font, tags=text_tags)
+        if index == highlight_index:
+            canvas.create_rectangle(x1, y1, x1 + cell_width, y1 + cell_height, outline=SUB_GRID_HIGHLIGHT_COLOR, width=SUB_GRID_HIGHLIGHT_WIDTH, tags=tags)
+
+# --- Retained main grid layer ---
+# The main grid never changes between Alt toggles, so it is drawn once per
+# monitor into the MAIN_GRID_TAG group and afterwards only shown/hidden. It is
+# rebuilt only when the signature (geometry + style) it was drawn with no longer matches.
+# The sub-grid is its own SUB_GRID_TAG layer on top: entering it hides the main
+# grid via item state, leaving it deletes just the sub-grid's items.
+def _main_grid_layer_signature(overlay):
+    return (overlay.monitor.width, overlay.monitor.height, overlay.font_scale, MAIN_GRID_COLS, MAIN_GRID_ROWS, GRID_RENDER_MODE,
+            OVERLAY_BACKGROUND_COLOR, GRID_COLOR, GRID_LINE_WIDTH, GRID_LINE_STYLE,
+            TEXT_COLOR, FONT_FAMILY, FONT_SIZE_BEHAVIOR, FONT_FIXED_SIZE, FONT_WEIGHT)
+
+def main_grid_bitmap_args(overlay):
+    """load_or_render_grid_bitmap() arguments for `overlay`'s main grid."""
+    style = {"OVERLAY_BACKGROUND_COLOR": OVERLAY_BACKGROUND_COLOR, "GRID_COLOR": GRID_COLOR,
+             "GRID_LINE_WIDTH": GRID_LINE_WIDTH, "GRID_LINE_STYLE": GRID_LINE_STYLE, "TEXT_COLOR": TEXT_COLOR,
+             "FONT_FAMILY": FONT_FAMILY, "FONT_WEIGHT": FONT_WEIGHT,
+             "FONT_SIZE_BEHAVIOR": FONT_SIZE_BEHAVIOR, "FONT_FIXED_SIZE": max(1, round(FONT_FIXED_SIZE * overlay.font_scale))}
+    return overlay.monitor.width, overlay.monitor.height, MAIN_GRID_COLS, MAIN_GRID_ROWS, main_grid_key_map, style
+
+def build_main_grid_bitmap_layer(overlay):
+    """Shows the main grid as one pre-rasterized image. Returns False if it could not be produced."""
+    try:
+        from overlay_bitmap import load_or_render_grid_bitmap
+        live_args = [main_grid_bitmap_args(other) for other in monitor_overlays if other is not overlay]
+        png_path, from_cache = load_or_render_grid_bitmap(*main_grid_bitmap_args(overlay), live_args=live_args)
+        overlay.photo = tk.PhotoImage(file=png_path)
+    except Exception as e: # Pillow missing, unwritable cache dir, unreadable PNG, ...
+        print(f"WARNING: Could not build the bitmap main grid ({e}). Falling back to canvas rendering.")
+        return False
+    overlay.canvas.create_image(0, 0, anchor="nw", image=overlay.photo, tags=(MAIN_GRID_TAG,))
+    print(f"Main grid bitmap {'loaded from cache' if from_cache else 'rendered'}: {png_path}")
+    return True
+
+def build_main_grid_layer(overlay):
+    if not overlay.canvas: return
+    overlay.canvas.delete(MAIN_GRID_TAG); overlay.photo = None
+    if GRID_RENDER_MODE != "bitmap" or not build_main_grid_bitmap_layer(overlay):
+        draw_grid(overlay, overlay.main_layout, is_sub_grid=False, tags=(MAIN_GRID_TAG,), label_tag=MAIN_LABEL_TAG, font_sizes=overlay.main_font_sizes)
+    overlay.layer_signature = _main_grid_layer_signature(overlay)
+
+# --- Progressive label filtering ---
+# Every label is tagged with each of its proper prefixes when the main layer is
+# built, so narrowing to the candidates of the keys typed so far is two
+# itemconfigure calls.
+def label_prefix_tag(label_tag, prefix):
+    return label_tag + "".join(f"_{ord(char)}" for char in prefix)
+
+def filter_main_grid_labels(prefix):
+    overlay = shown_overlay
+    if not overlay or not overlay.canvas or LABEL_FILTER_BEHAVIOR == "off" or overlay.photo is not None: return
+    canvas = overlay.canvas
+    if LABEL_FILTER_BEHAVIOR == "hide": canvas.itemconfigure(MAIN_LABEL_TAG, state="hidden")
+    else: canvas.itemconfigure(MAIN_LABEL_TAG, fill=LABEL_FILTER_DIM_COLOR)
+    canvas.itemconfigure(label_prefix_tag(MAIN_LABEL_TAG, prefix), fill=LABEL_FILTER_MATCH_COLOR, state="normal")
+
+def clear_main_grid_label_filter(overlay=None):
+    # Only called while the main layer is shown (or about to be hidden), so "normal" is right.
+    overlay = overlay or shown_overlay
+    if not overlay or not overlay.canvas or LABEL_FILTER_BEHAVIOR == "off" or overlay.photo is not None: return
+    overlay.canvas.itemconfigure(MAIN_LABEL_TAG, fill=TEXT_COLOR, state="normal")
+
+def draw_main_grid(overlay):
+    if not overlay.canvas: return
+    overlay.canvas.delete(SUB_GRID_TAG)
+    if overlay.layer_signature != _main_grid_layer_signature(overlay): build_main_grid_layer(overlay)
+    else: clear_main_grid_label_filter(overlay)
+    overlay.canvas.itemconfigure(MAIN_GRID_TAG, state="normal")
+
+def draw_sub_grid(overlay, main_index):
+    x1, y1, _, _ = overlay.main_layout.rect(main_index)
+    if overlay.canvas:
+        overlay.canvas.delete(SUB_GRID_TAG)
+        clear_main_grid_label_filter(overlay)
+        overlay.canvas.itemconfigure(MAIN_GRID_TAG, state="hidden")
+        draw_grid(overlay, overlay.sub_layout, offset_x=x1, offset_y=y1, is_sub_grid=True, tags=(SUB_GRID_TAG,))
+
+def perform_mouse_click_action(target_x, target_y, button_to_click='left'):
+    global overlay_visible, current_mode, main_label_node, main_label_prefix, _suppressed_keys_in_overlay
+    # Hide on the Tk thread; the click moves focus to its target anyway. Unless the overlay is
+    # click-through, the executor holds the click until the overlay is confirmed hidden.
+    ui_commands.post("hide", False)
+    wait_for_hide = not overlay_click_through
+    action_executor.submit("click", int(target_x), int(target_y), button_to_click, wait_for_hide)
+    overlay_visible = False; current_mode = "main"; main_label_node = LabelTrie.ROOT; main_label_prefix = ""
     _suppressed_keys_in_overlay.clear()
 
 def clear_pending_double_click():
     global pending_double_click_info
     pending_double_click_info["is_pending"] = False; pending_double_click_info["key_char"] = None
 
-def create_overlay_window():
-    global overlay_window, canvas
-    if overlay_window and overlay_window.winfo_exists(): overlay_window.destroy()
-    overlay_window = tk.Tk()
-    overlay_window.attributes('-alpha', OVERLAY_ALPHA); overlay_window.attributes('-topmost', True)
-    overlay_window.overrideredirect(True); overlay_window.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}+0+0")
-    overlay_window.configure(bg=OVERLAY_BACKGROUND_COLOR)
-    canvas = tk.Canvas(overlay_window, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, bg=OVERLAY_BACKGROUND_COLOR, highlightthickness=0)
-    canvas.pack(); overlay_window.withdraw()
-
-def show_overlay_tk():
-    global overlay_visible, current_mode, first_char_main, overlay_window, free_mode_active
+def create_overlay_windows():
+    """Creates the hidden Tk root and one borderless overlay window per monitor, each with its main grid pre-built."""
+    global overlay_root, shown_overlay, overlay_click_through
+    if overlay_root and overlay_root.winfo_exists(): overlay_root.destroy()
+    clear_label_fonts() # Fonts belong to the destroyed interpreter
+    overlay_root = tk.Tk()
+    overlay_root.withdraw()
+    ui_commands.attach(overlay_root) # Drain UI commands on this root's thread
+    shown_overlay = None; mapped_overlays.clear(); overlay_click_through = False
+    overlay_unmapped.set()
+    for overlay in monitor_overlays: create_monitor_window(overlay)
+    if OVERLAY_WARM_MODE and not all(set_click_through(overlay.window, True) for overlay in monitor_overlays):
+        print("WARNING: Click-through overlay not supported on this platform; the hidden warm overlay will swallow clicks.")
+    overlay_click_through = OVERLAY_CLICK_THROUGH and all(set_click_through(overlay.window, True) for overlay in monitor_overlays)
+    if OVERLAY_CLICK_THROUGH and not overlay_click_through:
+        print("WARNING: Click-through overlay not supported on this platform; clicks will hide the overlay first.")
+
+def apply_monitor_overlays(previous):
+    """Tk thread side of on_monitors_changed(): drops the windows of replaced overlays and creates the new ones'."""
+    for overlay in previous:
+        if overlay in monitor_overlays or overlay.window is None: continue
+        if overlay is shown_overlay: conceal_overlay_window(overlay, restore_focus=False)
+        mapped_overlays.discard(overlay)
+        overlay.window.destroy(); overlay.window = overlay.canvas = overlay.photo = None
+    if not overlay_root or not overlay_root.winfo_exists(): return # Not created yet; created from monitor_overlays
+    for overlay in monitor_overlays:
+        if overlay.window is None: create_monitor_window(overlay)
+
+def create_monitor_window(overlay):
+    monitor = overlay.monitor
+    window = overlay.window = tk.Toplevel(overlay_root)
+    window.attributes('-alpha', OVERLAY_ALPHA); window.attributes('-topmost', True)
+    window.overrideredirect(True); window.geometry(f"{monitor.width}x{monitor.height}+{monitor.x}+{monitor.y}") # "+-1920" = left of the primary; "-1920" would anchor at the right edge
+    window.configure(bg=OVERLAY_BACKGROUND_COLOR)
+    overlay.canvas = tk.Canvas(window, width=monitor.width, height=monitor.height, bg=OVERLAY_BACKGROUND_COLOR, highlightthickness=0)
+    overlay.canvas.pack(); overlay.presented = False; overlay.layer_signature = None
+    window.bind("<Map>", lambda e: e.widget is window and on_overlay_window_mapped(overlay))
+    window.bind("<Unmap>", lambda e: e.widget is window and on_overlay_window_unmapped(overlay))
+    if OVERLAY_WARM_MODE:
+        # Stay mapped for the whole session; hidden means alpha 0.0 plus pointer passthrough.
+        window.attributes('-alpha', 0.0); window.update_idletasks()
+    else:
+        window.withdraw()
+    if OVERLAY_WARM_MODE or overlay_click_through: set_click_through(window, True) # Support was checked by create_overlay_windows()
+    build_main_grid_layer(overlay) # Pre-build the main grid so the first Alt toggle only has to map the window
+
+def on_overlay_window_mapped(overlay):
+    mapped_overlays.add(overlay)
+    report_overlay_latency("cold: <Map>")
+
+def on_overlay_window_unmapped(overlay):
+    # Switching monitors unmaps one window while another is (being) mapped: only the unmap after a hide frees the pointer.
+    mapped_overlays.discard(overlay)
+    if not mapped_overlays and shown_overlay is None: overlay_unmapped.set()
+
+# --- Overlay window visibility ---
+# Cold (default): withdraw()/deiconify() the window.
+# Warm (OVERLAY_WARM_MODE): the window stays mapped; only alpha and click-through change.
+# At most one monitor's window is presented at a time.
+def present_overlay_window(overlay):
+    global shown_overlay, focus_before_overlay
+    window = overlay.window
+    if OVERLAY_WARM_MODE:
+        if shown_overlay is None: focus_before_overlay = get_focused_window(window) # Not the overlay we are switching from
+        if not overlay_click_through: overlay_unmapped.clear(); set_click_through(window, False)
+        window.attributes('-alpha', OVERLAY_ALPHA); window.focus_force()
+        if overlay_latency_started_at is not None:
+            window.update_idletasks(); report_overlay_latency("warm: alpha")
+    else:
+        overlay_unmapped.clear()
+        window.deiconify(); window.lift(); window.focus_force()
+    overlay.presented = True; shown_overlay = overlay
+
+def conceal_overlay_window(overlay, restore_focus=True):
+    global shown_overlay
+    window = overlay.window
+    if OVERLAY_WARM_MODE:
+        window.attributes('-alpha', 0.0); set_click_through(window, True)
+        overlay_unmapped.set()
+        if restore_focus: restore_focused_window(window, focus_before_overlay)
+    else:
+        window.withdraw()
+    overlay.presented = False
+    if shown_overlay is overlay: shown_overlay = None
+
+def wait_for_overlay_unmapped():
+    """
+    Blocks (off the Tk thread) until the overlay no longer covers the screen, so an injected
+    click reaches the window below. Warm mode is click-through as soon as it is concealed.
+    Runs on the action executor thread.
+    """
+    if not overlay_unmapped.wait(OVERLAY_UNMAP_TIMEOUT):
+        print(f"WARNING: Overlay unmap not confirmed within {OVERLAY_UNMAP_TIMEOUT}s; clicking anyway.")
+
+def report_overlay_latency(stage):
+    global overlay_latency_started_at
+    if overlay_latency_started_at is None: return
+    latency_ms = (time.perf_counter() - overlay_latency_started_at) * 1000
+    overlay_latency_started_at = None
+    overlay_latency_samples.append(latency_ms)
+    average_ms = sum(overlay_latency_samples) / len(overlay_latency_samples)
+    print(f"Overlay visible {latency_ms:.1f} ms after toggle ({stage}); average {average_ms:.1f} ms over {len(overlay_latency_samples)} toggles")
+
+# --- Overlay state (any thread) and rendering (Tk thread) ---
+# show_overlay()/hide_overlay() update the logical state right away, so the next
+# keystroke is interpreted correctly, and post render commands for the Tk thread.
+def pointer_monitor_index():
+    """Index of the monitor under the pointer, where the overlay opens."""
+    if len(monitor_overlays) == 1: return 0
+    try:
+        return monitor_model.monitor_at(*pointer.position()).index
+    except Exception as e:
+        print(f"WARNING: Could not read the pointer position ({e}); showing the overlay on the primary monitor.")
+        return PRIMARY_MONITOR.index
+
+def show_overlay():
+    global overlay_visible, current_mode, main_label_node, main_label_prefix, free_mode_active, active_monitor_index
     if free_mode_active:
-        free_mode_active = False
+        free_mode_active = False; motion_engine.release_all(); scroll_engine.release_all()
         print("Exited Free Mode (Overlay shown).")
-    if not overlay_window or not overlay_window.winfo_exists(): create_overlay_window()
-    overlay_visible = True; current_mode = "main"; first_char_main = None
+    overlay_visible = True; current_mode = "main"; main_label_node = LabelTrie.ROOT; main_label_prefix = ""
     _suppressed_keys_in_overlay.clear(); clear_pending_double_click()
-    draw_main_grid()
-    overlay_window.deiconify(); overlay_window.lift(); overlay_window.focus_force()
+    refresh_keyboard_hooks()
+    active_monitor_index = pointer_monitor_index()
+    ui_commands.post("show_main", active_monitor_index)
 
-def hide_overlay_tk():
-    global overlay_visible, overlay_window, current_mode, first_char_main
-    overlay_visible = False; current_mode = "main"; first_char_main = None
+def hide_overlay(restore_focus=True):
+    global overlay_visible, current_mode, main_label_node, main_label_prefix
+    overlay_visible = False; current_mode = "main"; main_label_node = LabelTrie.ROOT; main_label_prefix = ""
     _suppressed_keys_in_overlay.clear(); clear_pending_double_click()
-    if overlay_window and overlay_window.winfo_exists(): overlay_window.withdraw()
+    refresh_keyboard_hooks()
+    ui_commands.post("hide", restore_focus)
+
+def render_main_overlay(monitor_index):
+    if not overlay_root or not overlay_root.winfo_exists(): create_overlay_windows()
+    overlay = monitor_overlays[monitor_index]
+    if overlay.window is None: create_monitor_window(overlay) # Added by a monitor change this frame
+    if shown_overlay is not None and shown_overlay is not overlay: conceal_overlay_window(shown_overlay, restore_focus=False)
+    draw_main_grid(overlay)
+    if not overlay.presented: present_overlay_window(overlay)
+
+def render_sub_overlay(monitor_index, main_index):
+    overlay = monitor_overlays[monitor_index]
+    if overlay.window is None: create_monitor_window(overlay)
+    if shown_overlay is not None and shown_overlay is not overlay: conceal_overlay_window(shown_overlay, restore_focus=False)
+    draw_sub_grid(overlay, main_index)
+    if not overlay.presented: present_overlay_window(overlay) # The "show_main" of this frame was coalesced away
+
+def render_hidden_overlay(restore_focus=True):
+    if overlay_root and overlay_root.winfo_exists() and shown_overlay is not None: conceal_overlay_window(shown_overlay, restore_focus)
+
+def quit_overlay_mainloop():
+    if overlay_root and overlay_root.winfo_exists(): overlay_root.quit()
+
+ui_commands = UiCommandChannel({
+    "show_main": render_main_overlay,
+    "show_sub": render_sub_overlay,
+    "hide": render_hidden_overlay,
+    "filter": filter_main_grid_labels,
+    "clear_filter": clear_main_grid_label_filter,
+    "monitors": apply_monitor_overlays,
+    "quit": quit_overlay_mainloop,
+}, slots={"show_main": "scene", "show_sub": "scene", "hide": "scene", "filter": "filter", "clear_filter": "filter"},
+   resets={"scene": ("filter",)}, interval_ms=UI_FRAME_INTERVAL_MS)
 
 def actual_toggle_overlay():
-    global free_mode_active
+    global overlay_latency_started_at
     if overlay_visible:
-        if overlay_window and overlay_window.winfo_exists(): overlay_window.after(0, hide_overlay_tk)
+        hide_overlay()
     else:
-        if free_mode_active:
-            free_mode_active = False
-            print("Exited Free Mode (Overlay shown by Alt-toggle).")
-        if not overlay_window or not overlay_window.winfo_exists(): create_overlay_window()
-        if overlay_window and overlay_window.winfo_exists(): overlay_window.after(0, show_overlay_tk)
+        if REPORT_OVERLAY_LATENCY: overlay_latency_started_at = time.perf_counter()
+        show_overlay()
 
 def toggle_free_mode():
     global free_mode_active, overlay_visible
     if not ENABLE_FREE_MODE: return
     free_mode_active = not free_mode_active
     if free_mode_active:
-        if overlay_visible: hide_overlay_tk()
+        if overlay_visible: hide_overlay()
         print("Entered Free Mode. Use IJKL for mouse, M,BN for scroll. Press '`' to exit.")
     else:
+        motion_engine.release_all(); scroll_engine.release_all()
         print("Exited Free Mode.")
+    refresh_keyboard_hooks()
 
 
 # --- KEYBOARD EVENT HANDLERS ---
-def global_key_event_handler(event):
-    global g_left_alt_down_for_toggle, g_left_alt_press_timestamp, overlay_visible, free_mode_active
-    global pending_double_click_info, app_is_exiting
+# Every key action is compiled once into `key_dispatch` (see key_dispatch.py):
+# the hook lowercases the key name, works out the mode and runs the action the
+# table holds for (mode, event type, key). Actions take (event, key_name_lower).
+OVERLAY_MODIFIER_KEYS = frozenset(['alt right', 'alt gr', 'ctrl', 'right ctrl', 'left ctrl', 'control', 'shift', 'left shift', 'right shift'])
+OVERLAY_SYMBOL_KEYS = frozenset([';', ',', '.', '/'])
+# Key name -> grid label character. Non-ASCII letters are resolved by overlay_input_char().
+OVERLAY_INPUT_CHARS = {key: key.upper() for key in "abcdefghijklmnopqrstuvwxyz0123456789" + "".join(OVERLAY_SYMBOL_KEYS)}
+OVERLAY_INPUT_CHARS['space'] = ' '
+
+# Overlay keys that move it to another monitor, by number (left to right), when typed before any label key.
+MONITOR_SELECT_CHARS = {str(number): number - 1 for number in range(1, 10)}
+
+def overlay_input_char(key_name_lower):
+    input_char = OVERLAY_INPUT_CHARS.get(key_name_lower)
+    if input_char is None and len(key_name_lower) == 1 and key_name_lower.isalnum(): input_char = key_name_lower.upper()
+    return input_char
+
+# Held modifiers, fed by the hook; the grid click button is a lookup by mask (see modifier_state.py).
+modifier_state = ModifierState()
+CLICK_BUTTON_BY_MODIFIERS = compile_click_buttons(CLICK_MODIFIER_BUTTONS)
 
+def global_key_event_handler(event):
     if app_is_exiting: # If app is trying to exit, don't process further key events
         return
-
+    mode = "free" if free_mode_active else ("overlay" if overlay_visible else "idle")
+    actions, fallback = key_dispatch_tables[mode][event.event_type]
     key_name_lower = event.name.lower()
+    if key_name_lower in MODIFIER_KEY_BITS: modifier_state.update(key_name_lower, event.event_type == keyboard.KEY_DOWN)
+    action = actions.get(key_name_lower, fallback)
+    if action: action(event, key_name_lower)
 
-    # Free Mode Toggle Key
-    if ENABLE_FREE_MODE and key_name_lower == FREE_MODE_TOGGLE_KEY and event.event_type == keyboard.KEY_DOWN:
-        toggle_free_mode()
-        return
+def on_free_mode_toggle_key(event, key_name_lower):
+    toggle_free_mode()
 
-    # Overlay Alt-Toggle (if not in free mode)
-    if not free_mode_active and key_name_lower == LEFT_ALT_KEY_NAME:
-        if event.event_type == keyboard.KEY_DOWN:
-            if not g_left_alt_down_for_toggle:
-                g_left_alt_down_for_toggle = True; g_left_alt_press_timestamp = event.time
-        elif event.event_type == keyboard.KEY_UP:
-            if g_left_alt_down_for_toggle:
-                if 0.01 < (event.time - g_left_alt_press_timestamp) < 0.7: actual_toggle_overlay()
-            g_left_alt_down_for_toggle = False
-        return
-    elif not free_mode_active and g_left_alt_down_for_toggle and event.event_type == keyboard.KEY_DOWN and key_name_lower != LEFT_ALT_KEY_NAME:
-        g_left_alt_down_for_toggle = False
-
-    # Blind Double-Click (if not in free mode and overlay not visible)
-    if not free_mode_active and not overlay_visible and event.event_type == keyboard.KEY_DOWN and pending_double_click_info["is_pending"]:
-        current_input_char_for_map = ' ' if key_name_lower == 'space' else (key_name_lower.upper() if len(key_name_lower) == 1 else None)
-        if current_input_char_for_map and current_input_char_for_map == pending_double_click_info["key_char"] and \
-           (event.time - pending_double_click_info["time"]) < DOUBLE_CLICK_INTERVAL:
-            time.sleep(0.05); pyautogui.click(x=pending_double_click_info["screen_x"], y=pending_double_click_info["screen_y"], button=pending_double_click_info["button"])
-            clear_pending_double_click(); return
-        else: clear_pending_double_click()
-
-    # Free Mode Actions
-    if ENABLE_FREE_MODE and free_mode_active and event.event_type == keyboard.KEY_DOWN:
-        if key_name_lower == FREE_MODE_MOUSE_UP: pyautogui.move(0, -MOUSE_MOVE_STEP)
-        elif key_name_lower == FREE_MODE_MOUSE_DOWN: pyautogui.move(0, MOUSE_MOVE_STEP)
-        elif key_name_lower == FREE_MODE_MOUSE_LEFT: pyautogui.move(-MOUSE_MOVE_STEP, 0)
-        elif key_name_lower == FREE_MODE_MOUSE_RIGHT: pyautogui.move(MOUSE_MOVE_STEP, 0)
-        elif key_name_lower == FREE_MODE_SCROLL_UP: pyautogui.scroll(SCROLL_STEP)
-        elif key_name_lower == FREE_MODE_SCROLL_DOWN: pyautogui.scroll(-SCROLL_STEP)
-        elif key_name_lower == FREE_MODE_SCROLL_LEFT: pyautogui.hscroll(-SCROLL_STEP)
-        elif key_name_lower == FREE_MODE_SCROLL_RIGHT: pyautogui.hscroll(SCROLL_STEP)
-        return
+# Overlay Alt-Toggle (if not in free mode)
+def on_alt_key_down(event, key_name_lower):
+    global g_left_alt_down_for_toggle, g_left_alt_press_timestamp
+    if not g_left_alt_down_for_toggle:
+        g_left_alt_down_for_toggle = True; g_left_alt_press_timestamp = event.time
+        refresh_keyboard_hooks() # Watch every key until release, so chords are not taken for a tap
 
-    # Overlay Grid Logic
-    if overlay_visible:
-        on_key_event_for_active_overlay_logic(event)
+def on_alt_key_up(event, key_name_lower):
+    global g_left_alt_down_for_toggle
+    if g_left_alt_down_for_toggle:
+        if 0.01 < (event.time - g_left_alt_press_timestamp) < 0.7: actual_toggle_overlay()
+    g_left_alt_down_for_toggle = False
+    refresh_keyboard_hooks()
 
-# on_key_event_for_active_overlay_logic (unchanged from previous, paste it here)
-def on_key_event_for_active_overlay_logic(event):
-    global overlay_visible, current_mode, first_char_main, selected_main_cell_rect, overlay_window
-    global _suppressed_keys_in_overlay, pending_double_click_info
-    key_name_lower = event.name.lower()
-    if event.event_type == keyboard.KEY_UP:
-        _suppressed_keys_in_overlay.discard(key_name_lower); return
-    if key_name_lower == 'esc':
-        if overlay_window and overlay_window.winfo_exists(): overlay_window.after(0, hide_overlay_tk)
-        return
-    is_modifier = key_name_lower in [LEFT_ALT_KEY_NAME.lower(), 'alt right', 'alt gr', 'ctrl', 'right ctrl', 'left ctrl', 'control', 'shift', 'left shift', 'right shift']
-    if is_modifier: _suppressed_keys_in_overlay.add(key_name_lower); return
+def cancel_alt_toggle():
+    """Any other key pressed while Alt is held makes it a chord, not a toggle."""
+    global g_left_alt_down_for_toggle
+    if g_left_alt_down_for_toggle:
+        g_left_alt_down_for_toggle = False; refresh_keyboard_hooks()
+
+# Blind Double-Click (if not in free mode and overlay not visible)
+def on_idle_key_down(event, key_name_lower):
+    cancel_alt_toggle()
+    if not pending_double_click_info["is_pending"]: return
+    current_input_char_for_map = ' ' if key_name_lower == 'space' else (key_name_lower.upper() if len(key_name_lower) == 1 else None)
+    if current_input_char_for_map and current_input_char_for_map == pending_double_click_info["key_char"] and \
+       (event.time - pending_double_click_info["time"]) < DOUBLE_CLICK_INTERVAL:
+        action_executor.submit("click", pending_double_click_info["screen_x"], pending_double_click_info["screen_y"], pending_double_click_info["button"], True)
+    clear_pending_double_click(); refresh_keyboard_hooks()
+
+# Free Mode Actions
+def free_mode_action(kind, *args):
+    def action(event, key_name_lower): action_executor.submit(kind, *args)
+    return action
+
+def free_mode_engine_press(engine, direction):
+    def action(event, key_name_lower): engine.press(direction)
+    return action
+
+def free_mode_engine_release(engine, direction):
+    def action(event, key_name_lower): engine.release(direction)
+    return action
+
+# Overlay Grid Logic
+def on_overlay_key_up(event, key_name_lower):
+    _suppressed_keys_in_overlay.discard(key_name_lower)
+
+def on_overlay_escape(event, key_name_lower):
+    cancel_alt_toggle(); hide_overlay()
+
+def on_overlay_modifier_down(event, key_name_lower):
+    cancel_alt_toggle(); _suppressed_keys_in_overlay.add(key_name_lower)
+
+def on_overlay_key_down(event, key_name_lower):
+    global current_mode, main_label_node, main_label_prefix, selected_main_index, active_monitor_index
+    cancel_alt_toggle()
     if key_name_lower in _suppressed_keys_in_overlay: return
     _suppressed_keys_in_overlay.add(key_name_lower)
-    input_char_for_map = None
-    if key_name_lower == 'space': input_char_for_map = ' '
-    elif len(key_name_lower) == 1 and (key_name_lower.isalnum() or key_name_lower in [';', ',', '.', '/']): input_char_for_map = key_name_lower.upper()
+    input_char_for_map = overlay_input_char(key_name_lower)
     if input_char_for_map is None: return
     if current_mode == "main":
         clear_pending_double_click()
-        if first_char_main is None: first_char_main = input_char_for_map
-        else:
-            key_combo = first_char_main + input_char_for_map
-            if key_combo in main_grid_key_map:
-                r, c = main_grid_key_map[key_combo]
-                cell_w, cell_h = SCREEN_WIDTH / MAIN_GRID_COLS, SCREEN_HEIGHT / MAIN_GRID_ROWS
-                x1, y1 = c * cell_w, r * cell_h; x2, y2 = x1 + cell_w, y1 + cell_h
-                first_char_main = None
-                if overlay_window and overlay_window.winfo_exists(): overlay_window.after(0, lambda rect=(x1,y1,x2,y2): draw_sub_grid(rect))
-            else: first_char_main = None
+        node = main_label_trie.advance(main_label_node, input_char_for_map)
+        if node == LabelTrie.DEAD and main_label_node == LabelTrie.ROOT and \
+           MONITOR_SELECT_CHARS.get(input_char_for_map, len(monitor_overlays)) < len(monitor_overlays): # Monitor key
+            active_monitor_index = MONITOR_SELECT_CHARS[input_char_for_map]
+            ui_commands.post("show_main", active_monitor_index)
+            _suppressed_keys_in_overlay.clear()
+        elif node == LabelTrie.DEAD: # No label starts with these keys: start over
+            main_label_node = LabelTrie.ROOT; main_label_prefix = ""
+            ui_commands.post("clear_filter")
             _suppressed_keys_in_overlay.clear()
+        elif main_label_trie.cell(node) != -1: # Label complete
+            main_index = main_label_trie.cell(node)
+            main_label_node = LabelTrie.ROOT; main_label_prefix = ""
+            current_mode = "sub"; selected_main_index = main_index
+            ui_commands.post("show_sub", active_monitor_index, main_index)
+            _suppressed_keys_in_overlay.clear()
+        else:
+            main_label_node = node; main_label_prefix += input_char_for_map
+            ui_commands.post("filter", main_label_prefix)
     elif current_mode == "sub":
-        if not selected_main_cell_rect: _suppressed_keys_in_overlay.discard(key_name_lower); return
-        main_x1, main_y1, main_x2, main_y2 = selected_main_cell_rect
-        main_w, main_h = main_x2 - main_x1, main_y2 - main_y1
-        sub_cell_w, sub_cell_h = main_w / SUB_GRID_COLS, main_h / SUB_GRID_ROWS
-        target_r_sub, target_c_sub = -1, -1
-        if input_char_for_map == ' ': target_r_sub, target_c_sub = SUB_GRID_ROWS // 2, SUB_GRID_COLS // 2
-        elif input_char_for_map in sub_grid_key_map: target_r_sub, target_c_sub = sub_grid_key_map[input_char_for_map]
-        if target_r_sub != -1:
-            click_x = main_x1 + (target_c_sub * sub_cell_w) + (sub_cell_w / 2)
-            click_y = main_y1 + (target_r_sub * sub_cell_h) + (sub_cell_h / 2)
-            is_shift_mod = any(keyboard.is_pressed(k) for k in ['shift', 'left shift', 'right shift'])
-            perform_mouse_click_action(click_x, click_y, is_right_click=is_shift_mod)
-            pending_double_click_info.update({"is_pending": True, "key_char": input_char_for_map, "time": event.time, "screen_x": int(click_x), "screen_y": int(click_y), "button": 'right' if is_shift_mod else 'left'})
+        if selected_main_index < 0: _suppressed_keys_in_overlay.discard(key_name_lower); return
+        overlay = monitor_overlays[active_monitor_index]
+        if input_char_for_map == ' ': sub_index = overlay.sub_layout.index_at(SUB_GRID_ROWS // 2, SUB_GRID_COLS // 2)
+        else: sub_index = overlay.sub_layout.index_of(input_char_for_map)
+        if sub_index != -1:
+            click_x, click_y = overlay.click_targets.target(selected_main_index, sub_index)
+            button = CLICK_BUTTON_BY_MODIFIERS[modifier_state.mask]
+            perform_mouse_click_action(click_x, click_y, button)
+            pending_double_click_info.update({"is_pending": True, "key_char": input_char_for_map, "time": event.time, "screen_x": click_x, "screen_y": click_y, "button": button})
+            refresh_keyboard_hooks()
         else:
-            current_mode = "main"; first_char_main = None; clear_pending_double_click()
-            if overlay_window and overlay_window.winfo_exists(): overlay_window.after(0, draw_main_grid)
+            current_mode = "main"; main_label_node = LabelTrie.ROOT; main_label_prefix = ""; clear_pending_double_click()
+            ui_commands.post("show_main", active_monitor_index)
             _suppressed_keys_in_overlay.clear()
 
+def compile_key_dispatch():
+    """Builds the dispatch table from the current configuration. Later binds override earlier ones."""
+    down, up = keyboard.KEY_DOWN, keyboard.KEY_UP
+    table = KeyDispatchTable((down, up))
+    table.bind_fallback(("idle",), down, on_idle_key_down)
+    table.bind_fallback(("overlay",), down, on_overlay_key_down)
+    table.bind_fallback(("overlay",), up, on_overlay_key_up)
+    for key_name in OVERLAY_MODIFIER_KEYS | {LEFT_ALT_KEY_NAME.lower()}: # The toggle key is configurable
+        table.bind(("overlay",), down, key_name, on_overlay_modifier_down)
+    table.bind(("overlay",), down, 'esc', on_overlay_escape)
+    table.bind(("idle", "overlay"), down, LEFT_ALT_KEY_NAME, on_alt_key_down)
+    table.bind(("idle", "overlay"), up, LEFT_ALT_KEY_NAME, on_alt_key_up)
+    if ENABLE_FREE_MODE:
+        for key_name, (dx, dy) in ((FREE_MODE_MOUSE_UP, (0, -1)), (FREE_MODE_MOUSE_DOWN, (0, 1)),
+                                   (FREE_MODE_MOUSE_LEFT, (-1, 0)), (FREE_MODE_MOUSE_RIGHT, (1, 0))):
+            if FREE_MODE_CONTINUOUS_MOTION:
+                table.bind(("free",), down, key_name, free_mode_engine_press(motion_engine, (dx, dy)))
+                table.bind(("free",), up, key_name, free_mode_engine_release(motion_engine, (dx, dy))) # Leaving Free Mode releases all
+            else:
+                table.bind(("free",), down, key_name, free_mode_action("move", dx * MOUSE_MOVE_STEP, dy * MOUSE_MOVE_STEP))
+        for key_name, (dx, dy) in ((FREE_MODE_SCROLL_UP, (0, 1)), (FREE_MODE_SCROLL_DOWN, (0, -1)),
+                                   (FREE_MODE_SCROLL_LEFT, (-1, 0)), (FREE_MODE_SCROLL_RIGHT, (1, 0))):
+            if FREE_MODE_SMOOTH_SCROLL:
+                table.bind(("free",), down, key_name, free_mode_engine_press(scroll_engine, (dx, dy)))
+                table.bind(("free",), up, key_name, free_mode_engine_release(scroll_engine, (dx, dy)))
+            elif dy:
+                table.bind(("free",), down, key_name, free_mode_action("scroll", dy * SCROLL_STEP))
+            else:
+                table.bind(("free",), down, key_name, free_mode_action("hscroll", dx * SCROLL_STEP))
+        table.bind(DISPATCH_MODES, down, FREE_MODE_TOGGLE_KEY, on_free_mode_toggle_key)
+    return table
+
+key_dispatch = compile_key_dispatch()
+key_dispatch_tables = key_dispatch.tables
+startup_profile.mark("key dispatch")
+
+# --- Keyboard Hooks ---
+# While nothing is active only the trigger keys are hooked, so typing in other
+# applications never runs global_key_event_handler (see key_hooks.py).
+keyboard_hooks = AdaptiveKeyboardHook(global_key_event_handler)
+
+def idle_trigger_keys():
+    keys = {LEFT_ALT_KEY_NAME}
+    if ENABLE_FREE_MODE: keys.add(FREE_MODE_TOGGLE_KEY)
+    if pending_double_click_info["is_pending"]:
+        key_char = pending_double_click_info["key_char"]
+        keys.add('space' if key_char == ' ' else key_char.lower())
+    return keys
+
+def refresh_keyboard_hooks():
+    """Call after any change to the overlay, Free Mode, Alt toggle or pending double-click state."""
+    keyboard_hooks.set_trigger_keys(idle_trigger_keys())
+    full = free_mode_active or overlay_visible or g_left_alt_down_for_toggle
+    if full and not keyboard_hooks.full: modifier_state.sync(keyboard.is_pressed) # Modifiers are not hooked while idle
+    keyboard_hooks.set_full(full)
+
+
+# --- Control Channel Commands ---
+# Sent by later launches and scripts (see control_channel.py). They run on the
+# channel's thread and go through the same functions as the keyboard handlers.
+def control_show():
+    if not overlay_visible: show_overlay()
+    return f"Overlay shown on monitor {active_monitor_index + 1}."
+
+def control_hide():
+    if overlay_visible: hide_overlay()
+    return "Overlay hidden."
+
+def control_toggle():
+    actual_toggle_overlay()
+    return f"Overlay {'shown' if overlay_visible else 'hidden'}."
+
+def control_free_mode(state="toggle"):
+    if not ENABLE_FREE_MODE: raise ValueError("Free Mode is disabled in feature_config.py.")
+    if state not in ("on", "off", "toggle"): raise ValueError("Usage: free-mode [on|off|toggle]")
+    if state == "toggle" or (state == "on") != free_mode_active: toggle_free_mode()
+    return f"Free Mode {'on' if free_mode_active else 'off'}."
+
+def control_click(target, button="left"):
+    """Clicks `target`: [monitor:]LABEL[/SUBKEY], e.g. "AB/K" or "2:AB"; without a sub key, the cell's center."""
+    if button not in ("left", "right", "middle"): raise ValueError(f"Unknown button '{button}' (left, right or middle).")
+    monitor_number, separator, cell = target.upper().rpartition(":")
+    if separator and not monitor_number.isdigit(): cell = target.upper() # A ':' label key, not a monitor number
+    monitor_index = int(monitor_number) - 1 if separator and monitor_number.isdigit() else pointer_monitor_index()
+    if not 0 <= monitor_index < len(monitor_overlays): raise ValueError(f"No monitor {monitor_index + 1}.")
+    overlay = monitor_overlays[monitor_index]
+    label, sub_key = cell, ""
+    if main_label_trie.resolve(label) == -1 and "/" in cell[1:]: label, _, sub_key = cell.rpartition("/") # Labels may contain '/'
+    main_index = main_label_trie.resolve(label)
+    if main_index == -1: raise ValueError(f"No main grid label '{label}'.")
+    if sub_key: sub_index = overlay.sub_layout.index_of(sub_key)
+    else: sub_index = overlay.sub_layout.index_at(SUB_GRID_ROWS // 2, SUB_GRID_COLS // 2)
+    if sub_index == -1: raise ValueError(f"No sub grid key '{sub_key}'.")
+    click_x, click_y = overlay.click_targets.target(main_index, sub_index)
+    clear_pending_double_click()
+    perform_mouse_click_action(click_x, click_y, button)
+    refresh_keyboard_hooks()
+    return f"Clicked {button} at ({click_x}, {click_y})."
+
+RELOADABLE_CONFIG_MODULES = ("key_config", "style_config")
+
+def reload_config():
+    """
+    Re-reads key_config.py and style_config.py and rebuilds the layouts, overlay
+    windows and key dispatch. feature_config.py changes need a restart.
+    """
+    global key_dispatch, key_dispatch_tables
+    import importlib
+    modules = []
+    for module_name in RELOADABLE_CONFIG_MODULES: # All of them load, or nothing changes
+        try:
+            module = sys.modules.get(module_name)
+            modules.append(importlib.reload(module) if module else importlib.import_module(module_name))
+        except Exception as e: # A syntax error in the edit, say
+            raise ValueError(f"{module_name}.py not reloaded, keeping the running configuration: {e}")
+    for module in modules: # The names main_script imported from them
+        globals().update({name: value for name, value in vars(module).items()
+                          if name in globals() and (name.isupper() or name.startswith("get_"))})
+    if callable(globals().get("validate_configs")) and not validate_configs(): print("INFO: Review style_config.py for warnings.")
+    if overlay_visible: hide_overlay(restore_focus=False)
+    previous = monitor_overlays
+    compile_layouts() # Replaces every overlay: new grid, colors and fonts
+    ui_commands.post("monitors", tuple(previous))
+    key_dispatch = compile_key_dispatch(); key_dispatch_tables = key_dispatch.tables
+    refresh_keyboard_hooks()
+    return f"Reloaded {', '.join(module.__name__ + '.py' for module in modules)}; restart for feature_config.py changes."
+
+def control_stats():
+    return "\n".join([
+        f"Pointer action queue: {format_stats(action_executor.stats())}",
+        f"Keyboard events: {keyboard_hooks.key_hook_events} via trigger-key hooks, {keyboard_hooks.full_hook_events} via the full hook",
+        f"Control commands served: {control_server.served if control_server else 0}",
+    ])
+
+def control_status():
+    state = "Free Mode" if free_mode_active else (f"overlay shown on monitor {active_monitor_index + 1}" if overlay_visible else "idle")
+    return f"Mouseless is running (pid {os.getpid()}): {state}, {len(monitor_overlays)} monitor(s)."
+
+def control_quit():
+    quit_app("control channel")
+    return "Quitting."
+
+CONTROL_COMMANDS = {
+    "show": (control_show, "", "show the grid overlay on the monitor under the pointer"),
+    "hide": (control_hide, "", "hide the grid overlay"),
+    "toggle": (control_toggle, "", "show or hide the grid overlay, like the Alt key"),
+    "free-mode": (control_free_mode, "[on|off|toggle]", "enter or leave Free Mode"),
+    "click": (control_click, "[MONITOR:]LABEL[/KEY] [left|right|middle]", "click a grid cell, e.g. click AB/K"),
+    "reload-config": (reload_config, "", "re-read key_config.py and style_config.py"),
+    "stats": (control_stats, "", "pointer queue, keyboard hook and control channel counters"),
+    "status": (control_status, "", "whether Mouseless runs, and its mode"),
+    "quit": (control_quit, "", "quit Mouseless"),
+}
+
 
 # --- Main Execution ---
 if __name__ == "__main__":
+    startup_budget_ms = STARTUP_BUDGET_MS if args.startup_budget is None else args.startup_budget
+
     print("Starting Grid Helper...")
     # (Print startup messages as before)
-    print(f"Screen Dimensions: {SCREEN_WIDTH}x{SCREEN_HEIGHT}")
+    for monitor in monitor_model.monitors:
+        print(f"Monitor {monitor.index + 1}: {monitor.width}x{monitor.height} at ({monitor.x}, {monitor.y}), "
+              f"DPI {monitor.dpi or 'unknown'}{' (primary)' if monitor.is_primary else ''}")
     print(f"--- Style Settings (from style_config.py or defaults) ---")
     print(f"  Overlay Alpha: {OVERLAY_ALPHA}, Background: {OVERLAY_BACKGROUND_COLOR}")
-    print(f"  Grid Color: {GRID_COLOR}, Line Width: {GRID_LINE_WIDTH}, Style: {GRID_LINE_STYLE}")
+    print(f"  Grid Color: {GRID_COLOR}, Line Width: {GRID_LINE_WIDTH}, Style: {GRID_LINE_STYLE}, Render Mode: {GRID_RENDER_MODE}")
     print(f"  Text Color: {TEXT_COLOR}, Font: {FONT_FAMILY} ({FONT_WEIGHT})")
     print(f"  Font Size: {FONT_SIZE_BEHAVIOR}" + (f", Fixed Size: {FONT_FIXED_SIZE}" if FONT_SIZE_BEHAVIOR == "fixed" else ""))
     print(f"  Overlay Toggle Key: '{LEFT_ALT_KEY_NAME}', Double Click Interval: {DOUBLE_CLICK_INTERVAL}s")
+    print(f"  Overlay Window: {'warm (always mapped, alpha toggled)' if OVERLAY_WARM_MODE else 'cold (withdrawn when hidden)'}")
+    print(f"  Watch Monitor Changes: {WATCH_MONITOR_CHANGES}")
     if ENABLE_FREE_MODE:
         print(f"--- Free Mode Settings (from feature_config.py) ---")
         print(f"  Free Mode Toggle Key: '{FREE_MODE_TOGGLE_KEY}'")
-        print(f"  Mouse Move: '{FREE_MODE_MOUSE_UP}/{FREE_MODE_MOUSE_DOWN}/{FREE_MODE_MOUSE_LEFT}/{FREE_MODE_MOUSE_RIGHT}', Step: {MOUSE_MOVE_STEP}px")
-        print(f"  Scroll: '{FREE_MODE_SCROLL_UP}/{FREE_MODE_SCROLL_DOWN}/{FREE_MODE_SCROLL_LEFT}/{FREE_MODE_SCROLL_RIGHT}', Step: {SCROLL_STEP} units")
+        motion_desc = (f"continuous, {FREE_MODE_BASE_SPEED}-{FREE_MODE_MAX_SPEED} px/s at {FREE_MODE_TICK_HZ} Hz" if FREE_MODE_CONTINUOUS_MOTION
+                       else f"Step: {MOUSE_MOVE_STEP}px")
+        print(f"  Mouse Move: '{FREE_MODE_MOUSE_UP}/{FREE_MODE_MOUSE_DOWN}/{FREE_MODE_MOUSE_LEFT}/{FREE_MODE_MOUSE_RIGHT}', {motion_desc}")
+        scroll_desc = (f"smooth, {FREE_MODE_SCROLL_BASE_SPEED}-{FREE_MODE_SCROLL_MAX_SPEED} notches/s" if FREE_MODE_SMOOTH_SCROLL
+                       else f"Step: {SCROLL_STEP} units")
+        print(f"  Scroll: '{FREE_MODE_SCROLL_UP}/{FREE_MODE_SCROLL_DOWN}/{FREE_MODE_SCROLL_LEFT}/{FREE_MODE_SCROLL_RIGHT}', {scroll_desc}")
     else:
         print("--- Free Mode is DISABLED (via feature_config.py) ---")
+    print(f"  Pointer Backend: {pointer.name}")
     print(f"-----------------------------------------------------------")
     print(f"Main Grid: {MAIN_GRID_ROWS}x{MAIN_GRID_COLS}, Sub Grid: {SUB_GRID_ROWS}x{SUB_GRID_COLS}")
 
@@ -390,11 +1033,22 @@ if __name__ == "__main__":
     if not main_grid_key_map or not sub_grid_key_map: print("\nKEY_CONFIG WARNING: Key maps empty.")
     else: print("Key maps loaded.")
 
-    create_overlay_window() # Create Tkinter window (hidden initially)
-    keyboard.hook(global_key_event_handler) # Hook global keyboard events
+    create_overlay_windows() # Create the Tkinter windows (hidden initially)
+    startup_profile.mark("windows")
+    if WATCH_MONITOR_CHANGES and not monitor_watcher.start():
+        print("WARNING: Monitor changes cannot be detected here; restart the app after connecting or removing a monitor.")
+    action_executor.start() # Pointer actions run here, off the keyboard hook thread
+    if ENABLE_FREE_MODE and FREE_MODE_CONTINUOUS_MOTION: motion_engine.start()
+    if ENABLE_FREE_MODE and FREE_MODE_SMOOTH_SCROLL: scroll_engine.start()
+    keyboard_hooks.start(); refresh_keyboard_hooks() # Hook the trigger keys; every key only while needed
+    if control_server: control_server.serve(CONTROL_COMMANDS) # Answers the launches queued up since claim()
+    startup_profile.mark("threads + hooks")
     print(f"\nKeyboard hooked. App active. Tray icon should appear if pystray is installed.")
     print(f"  Toggle Overlay: '{LEFT_ALT_KEY_NAME}'")
     if ENABLE_FREE_MODE: print(f"  Toggle Free Mode: '{FREE_MODE_TOGGLE_KEY}'")
+    if len(monitor_overlays) > 1: print(f"  Move Overlay to Monitor: '1'-'{min(len(monitor_overlays), 9)}' before the first label key")
+    if control_server: print(f"  Control channel: {control_server.address} (later launches forward their command here)")
+    if args.command: print(run_command(CONTROL_COMMANDS, args.command)[1]) # E.g. `main_script.py show` when not running yet
 
 
     tray_thread = None
@@ -405,11 +1059,17 @@ if __name__ == "__main__":
         tray_thread.start()
     else:
         print("System tray icon disabled (pystray or Pillow not found).")
+        finish_startup("tray (disabled)")
 
+    startup_check_failed = False
     try:
+        if args.startup_check:
+            # Everything is up once the tray icon is; then shut down without entering the mainloop.
+            if not startup_reported.wait(10.0): finish_startup("tray (timed out)")
+            startup_check_failed = startup_profile.over_budget(startup_budget_ms)
         # Start the Tkinter event loop (this is blocking for the main thread)
-        if overlay_window and overlay_window.winfo_exists():
-            overlay_window.mainloop() # This will run until overlay_window.quit() is called
+        elif overlay_root and overlay_root.winfo_exists():
+            overlay_root.mainloop() # This will run until overlay_root.quit() is called
 
         # If mainloop finishes (e.g., from tray quit), ensure app exits cleanly
         # This part might only be reached if Tkinter was not used or quit early
@@ -438,13 +1098,23 @@ if __name__ == "__main__":
             tray_thread.join(timeout=2) # Give it a couple of seconds
 
         print("Unhooking keyboard...")
-        keyboard.unhook_all() # Crucial for cleanup
+        try:
+            keyboard_hooks.stop()
+            keyboard.unhook_all() # Crucial for cleanup
+        except Exception as e: # Keep shutting down: the threads below and the exit status still matter
+            print(f"WARNING: Unhooking the keyboard failed: {e}")
+        print(f"Keyboard events handled: {keyboard_hooks.key_hook_events} via trigger-key hooks, {keyboard_hooks.full_hook_events} via the full hook")
+
+        motion_engine.stop(); scroll_engine.stop(); monitor_watcher.stop()
+        if control_server: control_server.stop() # After this, a new launch starts a new instance
+        action_executor.stop()
+        print(f"Pointer action queue: {format_stats(action_executor.stats())}")
 
-        # Tkinter cleanup: If overlay_window.quit() was called, mainloop ends.
+        # Tkinter cleanup: If overlay_root.quit() was called, mainloop ends.
         # If mainloop ended for other reasons or wasn't running, ensure destroy.
-        if overlay_window and overlay_window.winfo_exists():
-            print("Destroying Tkinter window...")
-            overlay_window.destroy()
+        if overlay_root and overlay_root.winfo_exists():
+            print("Destroying Tkinter windows...")
+            overlay_root.destroy()
 
         print("Grid Helper finished.")
-        sys.exit(0) # Force exit if anything is lingering
\ No newline at end of file
+        sys.exit(1 if startup_check_failed else 0) # Force exit if anything is lingering; 1 = --startup-check over budget
\ No newline at end of file
@@ -0,0 +1,80 @@
+# modifier_state.py
+
+# --- Modifier State Tracking ---
+# Held modifiers as a bitmask, fed from the same key events the hook already
+# receives (instead of asking `keyboard.is_pressed` per modifier name at click
+# time). Left and right keys are tracked separately, so releasing one Shift
+# while the other is still held keeps MOD_SHIFT set.
+#
+# Modifiers are not hooked while idle (every Shift or Ctrl press in every other
+# application would run our handler), so the state is re-read with sync() when
+# the full hook is installed and followed by its events from then on.
+MOD_SHIFT = 1
+MOD_CTRL = 2
+MOD_ALT = 4
+MOD_SUPER = 8
+
+MODIFIER_BITS = {"shift": MOD_SHIFT, "ctrl": MOD_CTRL, "alt": MOD_ALT, "super": MOD_SUPER}
+
+# Lowercased `keyboard` event names -> bit.
+MODIFIER_KEY_BITS = {
+    "shift": MOD_SHIFT, "left shift": MOD_SHIFT, "right shift": MOD_SHIFT,
+    "ctrl": MOD_CTRL, "left ctrl": MOD_CTRL, "right ctrl": MOD_CTRL, "control": MOD_CTRL,
+    "alt": MOD_ALT, "left alt": MOD_ALT, "right alt": MOD_ALT, "alt right": MOD_ALT, "alt gr": MOD_ALT,
+    "windows": MOD_SUPER, "left windows": MOD_SUPER, "right windows": MOD_SUPER,
+    "command": MOD_SUPER, "left command": MOD_SUPER, "right command": MOD_SUPER,
+}
+
+# Names for keyboard.is_pressed(); each covers both sides of the keyboard.
+MODIFIER_SYNC_KEYS = {"shift": MOD_SHIFT, "ctrl": MOD_CTRL, "alt": MOD_ALT, "windows": MOD_SUPER}
+
+class ModifierState:
+    def __init__(self):
+        self.mask = 0
+        self._held = {} # key name -> bit
+
+    def update(self, key_name_lower, is_down):
+        """Feeds one event; the caller only needs to pass keys in MODIFIER_KEY_BITS."""
+        bit = MODIFIER_KEY_BITS.get(key_name_lower)
+        if not bit: return
+        if is_down: self._held[key_name_lower] = bit
+        else:
+            self._held.pop(key_name_lower, None)
+            for name, synced_bit in MODIFIER_SYNC_KEYS.items(): # Held since sync(), side unknown
+                if synced_bit == bit and name != key_name_lower: self._held.pop(name, None)
+        self._update_mask()
+
+    def sync(self, is_pressed):
+        """Replaces the state with `is_pressed(name)` (keyboard.is_pressed) for each modifier."""
+        self.reset()
+        for name, bit in MODIFIER_SYNC_KEYS.items():
+            try:
+                if is_pressed(name): self._held[name] = bit
+            except ValueError: # No such key on this layout (e.g. "windows" on macOS)
+                pass
+        self._update_mask()
+
+    def reset(self):
+        self._held.clear()
+        self.mask = 0
+
+    def _update_mask(self):
+        mask = 0
+        for held_bit in self._held.values(): mask |= held_bit
+        self.mask = mask
+
+
+def compile_click_buttons(modifier_buttons, default="left"):
+    """
+    Turns {"shift": "right", "ctrl": "middle", ...} into a tuple indexed by the
+    modifier mask. Where several configured modifiers are held, the one listed
+    first wins.
+    """
+    bits = []
+    for name, button in modifier_buttons.items():
+        if name in MODIFIER_BITS: bits.append((MODIFIER_BITS[name], button))
+        else: print(f"WARNING: Unknown click modifier '{name}'. Use one of: {', '.join(MODIFIER_BITS)}.")
+    buttons = []
+    for mask in range(1 << len(MODIFIER_BITS)):
+        buttons.append(next((button for bit, button in bits if mask & bit), default))
+    return tuple(buttons)
@@ -0,0 +1,101 @@
+# monitor_model.py
+
+# --- Monitor Geometry Model ---
+# The monitor set as plain tuples in virtual-desktop pixels. Origins can be
+# negative (a monitor left of or above the primary one) and every monitor has
+# its own size and DPI. Monitors are numbered left to right, top to bottom,
+# which is the order the overlay's monitor keys (1, 2, 3, ...) follow.
+#
+# MonitorModel caches the set and only reports a change when the geometry
+# actually differs, so callers rebuild layouts and overlays only then.
+from collections import namedtuple
+
+BASE_DPI = 96.0
+
+class Monitor(namedtuple("Monitor", "index name x y width height is_primary dpi")):
+    __slots__ = ()
+
+    @property
+    def scale(self):
+        """Scale factor relative to 96 DPI (1.0 when the DPI is unknown)."""
+        return self.dpi / BASE_DPI if self.dpi else 1.0
+
+    def contains(self, px, py):
+        return self.x <= px < self.x + self.width and self.y <= py < self.y + self.height
+
+
+def _dpi_from_size(width_px, width_mm):
+    # Monitors that do not report a physical size (or report nonsense) get None.
+    if not width_mm or width_mm < 50: return None
+    return round(width_px / (width_mm / 25.4))
+
+def read_monitors(dpi_for=None):
+    """
+    Current monitors from screeninfo, numbered left to right. `dpi_for(x, y)`
+    may supply the DPI of the monitor containing a point; otherwise it is
+    derived from the physical size screeninfo reports, if any.
+    """
+    from screeninfo import get_monitors
+    found = sorted(get_monitors(), key=lambda m: (m.x, m.y))
+    if not found: raise RuntimeError("screeninfo found no monitors")
+    monitors = []
+    for index, m in enumerate(found):
+        dpi = dpi_for(m.x, m.y) if dpi_for else None
+        if dpi is None: dpi = _dpi_from_size(m.width, getattr(m, "width_mm", None))
+        is_primary = bool(getattr(m, "is_primary", False)) or (m.x == 0 and m.y == 0)
+        monitors.append(Monitor(index, getattr(m, "name", None) or f"Monitor {index + 1}",
+                                m.x, m.y, m.width, m.height, is_primary, dpi))
+    return tuple(monitors)
+
+def monitor_set_signature(monitors):
+    return tuple((m.x, m.y, m.width, m.height, m.dpi) for m in monitors)
+
+
+class MonitorModel:
+    """
+    reader -- callable returning a tuple of Monitor (read_monitors by default)
+    """
+
+    def __init__(self, reader=read_monitors):
+        self.reader = reader
+        self.monitors = ()
+        self.signature = None
+
+    def refresh(self):
+        """Re-reads the monitor set. Returns True if its geometry changed."""
+        monitors = self.reader()
+        signature = monitor_set_signature(monitors)
+        if signature == self.signature: return False
+        self.monitors, self.signature = monitors, signature
+        return True
+
+    def primary(self):
+        return next((m for m in self.monitors if m.is_primary), self.monitors[0])
+
+    def monitor_at(self, px, py):
+        """Monitor containing the point, else the nearest one (the point may be in a gap between monitors)."""
+        for monitor in self.monitors:
+            if monitor.contains(px, py): return monitor
+        def distance(m):
+            dx = max(m.x - px, 0, px - (m.x + m.width - 1))
+            dy = max(m.y - py, 0, py - (m.y + m.height - 1))
+            return dx * dx + dy * dy
+        return min(self.monitors, key=distance)
+
+    def virtual_bounds(self):
+        """(x1, y1, x2, y2) of the rectangle covering every monitor."""
+        return (min(m.x for m in self.monitors), min(m.y for m in self.monitors),
+                max(m.x + m.width for m in self.monitors), max(m.y + m.height for m in self.monitors))
+
+    def __len__(self):
+        return len(self.monitors)
+
+
+if __name__ == "__main__":
+    model = MonitorModel()
+    model.refresh()
+    x1, y1, x2, y2 = model.virtual_bounds()
+    print(f"{len(model)} monitor(s), virtual desktop ({x1}, {y1}) - ({x2}, {y2})")
+    for m in model.monitors:
+        print(f"  [{m.index + 1}] {m.name}: {m.width}x{m.height} at ({m.x}, {m.y}), "
+              f"DPI {m.dpi or 'unknown'} (scale {m.scale:.2f}){', primary' if m.is_primary else ''}")
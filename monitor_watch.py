@@ -0,0 +1,224 @@
+# monitor_watch.py
+
+# --- Monitor Change Detection ---
+# Docking, undocking or rearranging monitors changes the geometry the grids were
+# compiled for. Instead of re-reading the monitor set on every overlay toggle,
+# a watcher thread waits for the window system's own notification:
+#   Linux/X11: XRandR RRScreenChangeNotify (and RRNotify for CRTC changes) on a
+#              private display connection, waited on with select() on its socket
+#   Windows:   WM_DISPLAYCHANGE, broadcast to top-level windows, received by a
+#              hidden (never shown) window with its own message loop
+# A dock event arrives as a burst of notifications, so the callback runs once,
+# on a separate thread, after no new notification has arrived for `settle` seconds.
+import ctypes
+import ctypes.util
+import select
+import sys
+import threading
+
+# --- X11 (XRandR) ---
+RRScreenChangeNotify = 0 # Offsets from the extension's event base
+RRNotify = 1
+RRScreenChangeNotifyMask = 1 << 0
+RRCrtcChangeNotifyMask = 1 << 1
+XEVENT_SIZE = 192 # sizeof(XEvent): a union padded to 24 longs
+
+# --- Windows ---
+WM_DISPLAYCHANGE = 0x007E
+WM_QUIT = 0x0012
+
+_xrandr = None # (libX11, libXrandr) once loaded, False if unavailable
+
+class MonitorWatcher:
+    """
+    on_change -- callable() run on the watcher's debounce thread after the monitor setup changed
+    settle    -- seconds without further notifications before on_change runs
+    """
+
+    def __init__(self, on_change, settle=0.5):
+        self.on_change = on_change
+        self.settle = settle
+        self.method = None # "xrandr" / "wm_displaychange" once started
+        self.notifications = 0
+        self._pending = threading.Event()
+        self._stopping = False
+        self._threads = []
+        self._started_ok = False # Set by the watcher thread once notifications are subscribed
+        self._thread_id = None # Windows: thread running the message loop
+
+    def start(self):
+        """Starts watching. Returns False (and watches nothing) where no notification source is available."""
+        if sys.platform == "win32": target, method = self._run_windows, "wm_displaychange"
+        elif _load_xrandr(): target, method = self._run_x11, "xrandr"
+        else: return False
+        self._stopping = False
+        self.method = method
+        ready = threading.Event()
+        self._started_ok = False
+        self._threads = [threading.Thread(target=target, args=(ready,), name="MonitorWatcher", daemon=True),
+                         threading.Thread(target=self._debounce, name="MonitorWatcherDebounce", daemon=True)]
+        for thread in self._threads: thread.start()
+        ready.wait(2.0)
+        if not self._started_ok: self.stop(); self.method = None
+        return self._started_ok
+
+    def stop(self, timeout=1.0):
+        self._stopping = True
+        self._pending.set()
+        if self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        for thread in self._threads: thread.join(timeout)
+        self._threads = []
+
+    def _notify(self):
+        self.notifications += 1
+        self._pending.set()
+
+    def _debounce(self):
+        while True:
+            self._pending.wait()
+            if self._stopping: return
+            self._pending.clear()
+            while self._pending.wait(self.settle): # Still changing: wait for a quiet period
+                if self._stopping: return
+                self._pending.clear()
+            try:
+                self.on_change()
+            except Exception as e: # Keep watching; the next change retries
+                print(f"ERROR: Handling the monitor change failed: {e}")
+
+    # --- Linux / X11 ---
+    def _run_x11(self, ready):
+        xlib, xrandr = _xrandr
+        display = xlib.XOpenDisplay(None)
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not display or not xrandr.XRRQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            if display: xlib.XCloseDisplay(display)
+            print("WARNING: XRandR not available; monitor changes will not be detected.")
+            ready.set(); return
+        xrandr.XRRSelectInput(display, xlib.XDefaultRootWindow(display), RRScreenChangeNotifyMask | RRCrtcChangeNotifyMask)
+        xlib.XFlush(display)
+        self._started_ok = True; ready.set()
+        fd = xlib.XConnectionNumber(display)
+        event = ctypes.create_string_buffer(XEVENT_SIZE)
+        try:
+            while not self._stopping:
+                if not xlib.XPending(display):
+                    select.select([fd], [], [], 0.5) # Timeout only so stop() is noticed
+                    continue
+                xlib.XNextEvent(display, event)
+                event_type = ctypes.c_int.from_buffer(event).value
+                if event_type == event_base.value + RRScreenChangeNotify:
+                    xrandr.XRRUpdateConfiguration(event)
+                    self._notify()
+                elif event_type == event_base.value + RRNotify:
+                    self._notify()
+        finally:
+            xlib.XCloseDisplay(display)
+
+    # --- Windows ---
+    def _run_windows(self, ready):
+        from ctypes import wintypes
+        # Own WinDLL instances: the prototypes below do not leak into ctypes.windll, and GetLastError survives.
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        LRESULT = ctypes.c_ssize_t
+        WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+        class WNDCLASSW(ctypes.Structure):
+            _fields_ = [("style", wintypes.UINT), ("lpfnWndProc", WNDPROC), ("cbClsExtra", ctypes.c_int),
+                        ("cbWndExtra", ctypes.c_int), ("hInstance", wintypes.HINSTANCE), ("hIcon", wintypes.HICON),
+                        ("hCursor", wintypes.HANDLE), ("hbrBackground", wintypes.HBRUSH),
+                        ("lpszMenuName", wintypes.LPCWSTR), ("lpszClassName", wintypes.LPCWSTR)]
+
+        # Handles are pointer-sized: without these prototypes ctypes truncates them to 32-bit ints on 64-bit Windows.
+        kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        user32.RegisterClassW.argtypes = [ctypes.POINTER(WNDCLASSW)]
+        user32.RegisterClassW.restype = wintypes.ATOM
+        user32.UnregisterClassW.argtypes = [wintypes.LPCWSTR, wintypes.HINSTANCE]
+        user32.CreateWindowExW.argtypes = [wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+                                           ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                           wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID]
+        user32.CreateWindowExW.restype = wintypes.HWND
+        user32.DestroyWindow.argtypes = [wintypes.HWND]
+        user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.DefWindowProcW.restype = LRESULT
+        user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+        user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+
+        def window_proc(hwnd, message, wparam, lparam):
+            if message == WM_DISPLAYCHANGE: self._notify()
+            return user32.DefWindowProcW(hwnd, message, wparam, lparam)
+
+        self._window_proc = WNDPROC(window_proc) # Must outlive the window
+        window_class = WNDCLASSW(lpfnWndProc=self._window_proc, hInstance=kernel32.GetModuleHandleW(None),
+                                 lpszClassName="MouselessMonitorWatcher")
+        if not user32.RegisterClassW(ctypes.byref(window_class)):
+            print(f"WARNING: Could not register the monitor watcher window class (error {ctypes.get_last_error()}); "
+                  "monitor changes will not be detected.")
+            ready.set(); return
+        # A top-level window (not a message-only one): broadcasts like WM_DISPLAYCHANGE only reach top-level windows.
+        hwnd = user32.CreateWindowExW(0, window_class.lpszClassName, "Mouseless monitor watcher", 0,
+                                      0, 0, 0, 0, None, None, window_class.hInstance, None)
+        if not hwnd:
+            print(f"WARNING: Could not create the monitor watcher window (error {ctypes.get_last_error()}); "
+                  "monitor changes will not be detected.")
+            user32.UnregisterClassW(window_class.lpszClassName, window_class.hInstance)
+            ready.set(); return
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self._started_ok = True; ready.set()
+        message = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(message), None, 0, 0) > 0: # 0 on WM_QUIT, -1 on error
+            user32.TranslateMessage(ctypes.byref(message))
+            user32.DispatchMessageW(ctypes.byref(message))
+        user32.DestroyWindow(hwnd)
+        user32.UnregisterClassW(window_class.lpszClassName, window_class.hInstance) # So a restarted watcher can register it again
+
+
+def _load_xrandr():
+    global _xrandr
+    if _xrandr is None:
+        _xrandr = False
+        try:
+            xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+            xrandr = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Xrandr") or "libXrandr.so.2")
+            xlib.XOpenDisplay.restype = ctypes.c_void_p
+            xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+            for name in ("XCloseDisplay", "XFlush", "XPending", "XConnectionNumber"):
+                getattr(xlib, name).argtypes = [ctypes.c_void_p]
+            xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+            xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+            xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+            xrandr.XRRQueryExtension.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+            xrandr.XRRSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int]
+            xrandr.XRRUpdateConfiguration.argtypes = [ctypes.c_void_p]
+            _xrandr = (xlib, xrandr)
+        except (OSError, AttributeError) as e:
+            print(f"WARNING: XRandR unavailable, monitor changes will not be detected: {e}")
+    return _xrandr
+
+
+if __name__ == "__main__":
+    # Prints the monitor set whenever it changes; plug or unplug a monitor to try it.
+    # Usage: python monitor_watch.py
+    import time
+    from monitor_model import MonitorModel
+
+    model = MonitorModel()
+    model.refresh()
+
+    def report():
+        changed = model.refresh()
+        print(f"{time.strftime('%H:%M:%S')} change notified ({watcher.notifications} notifications so far), "
+              f"geometry {'changed' if changed else 'unchanged'}:")
+        for m in model.monitors: print(f"  [{m.index + 1}] {m.width}x{m.height} at ({m.x}, {m.y})")
+
+    watcher = MonitorWatcher(report)
+    if not watcher.start(): sys.exit("No monitor change notifications on this platform.")
+    print(f"Watching for monitor changes via {watcher.method}. Ctrl+C to stop.")
+    try:
+        while True: time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
@@ -0,0 +1,132 @@
+# overlay_bitmap.py
+
+# --- Pre-rasterized Main Grid ---
+# Optional rendering mode (GRID_RENDER_MODE = "bitmap" in style_config.py).
+# The whole labelled main grid is rasterized once with Pillow into a PNG in the
+# user cache directory. The file name is a hash of everything that affects the
+# picture (screen size, grid dimensions, key map and the style values it is
+# rendered with, including the monitor's DPI-scaled font size),
+# so later launches just load the PNG and the overlay becomes one image item.
+# Each PNG is screen-sized, so rendering a new one deletes those no monitor
+# uses any more (e.g. after a style or resolution change).
+import glob
+import hashlib
+import os
+
+from cache_paths import get_cache_dir
+from grid_render import GRID_LINE_DASH_PATTERNS, label_font_size
+
+BITMAP_CACHE_SUBDIR = "overlay_bitmaps"
+BITMAP_FORMAT_VERSION = 1 # Bump when the rasterizer output changes, to orphan old cache files
+
+# Tk font sizes are points; Pillow font sizes are pixels.
+POINTS_TO_PIXELS = 96 / 72
+
+# Font files for common families, (regular, bold). Anything else is tried as "<family>.ttf".
+KNOWN_FONT_FILES = {
+    "consolas": ("consola.ttf", "consolab.ttf"),
+    "arial": ("arial.ttf", "arialbd.ttf"),
+    "courier new": ("cour.ttf", "courbd.ttf"),
+    "dejavu sans mono": ("DejaVuSansMono.ttf", "DejaVuSansMono-Bold.ttf"),
+}
+
+def bitmap_cache_key(screen_width, screen_height, cols, rows, key_map, style_values):
+    """Hex digest identifying one rendered main grid."""
+    hasher = hashlib.sha1()
+    hasher.update(repr((BITMAP_FORMAT_VERSION, screen_width, screen_height, cols, rows)).encode())
+    hasher.update(repr(sorted(key_map.items())).encode())
+    hasher.update(repr(sorted(style_values.items())).encode())
+    return hasher.hexdigest()
+
+def _load_font(family, weight, size_px, font_cache):
+    cached = font_cache.get(size_px)
+    if cached is not None: return cached
+    from PIL import ImageFont
+    bold = weight == "bold"
+    candidates = []
+    known = KNOWN_FONT_FILES.get(family.lower())
+    if known: candidates.append(known[1] if bold else known[0])
+    candidates += [f"{family}.ttf", f"{family.lower()}.ttf", family]
+    font = None
+    for candidate in candidates:
+        try:
+            font = ImageFont.truetype(candidate, size_px)
+            break
+        except OSError:
+            continue
+    if font is None:
+        try: font = ImageFont.load_default(size_px)
+        except TypeError: font = ImageFont.load_default() # Pillow < 10.1 has no sized default font
+    font_cache[size_px] = font
+    return font
+
+def _draw_line(draw, x1, y1, x2, y2, color, line_width, dash):
+    if not dash:
+        draw.line((x1, y1, x2, y2), fill=color, width=line_width)
+        return
+    # Pillow has no dash support; emit the segments ourselves (lines are axis-aligned).
+    on, off = dash
+    horizontal = y1 == y2
+    start, end = (x1, x2) if horizontal else (y1, y2)
+    pos = start
+    while pos < end:
+        seg_end = min(pos + on, end)
+        if horizontal: draw.line((pos, y1, seg_end, y1), fill=color, width=line_width)
+        else: draw.line((x1, pos, x1, seg_end), fill=color, width=line_width)
+        pos += on + off
+
+def render_grid_bitmap(width, height, cols, rows, cell_to_key_map, style):
+    """
+    Rasterizes the labelled grid to a PIL.Image, mirroring the canvas renderer.
+    `style` holds OVERLAY_BACKGROUND_COLOR, GRID_COLOR, GRID_LINE_WIDTH, GRID_LINE_STYLE,
+    TEXT_COLOR, FONT_FAMILY, FONT_WEIGHT, FONT_SIZE_BEHAVIOR and FONT_FIXED_SIZE.
+    """
+    from PIL import Image, ImageDraw
+    image = Image.new("RGB", (width, height), style["OVERLAY_BACKGROUND_COLOR"])
+    draw = ImageDraw.Draw(image)
+    cell_width, cell_height = width / cols, height / rows
+    dash = GRID_LINE_DASH_PATTERNS.get(style["GRID_LINE_STYLE"])
+    for r_idx in range(rows + 1):
+        line_y = min(round(r_idx * cell_height), height - 1)
+        _draw_line(draw, 0, line_y, width, line_y, style["GRID_COLOR"], style["GRID_LINE_WIDTH"], dash)
+    for c_idx in range(cols + 1):
+        line_x = min(round(c_idx * cell_width), width - 1)
+        _draw_line(draw, line_x, 0, line_x, height, style["GRID_COLOR"], style["GRID_LINE_WIDTH"], dash)
+    font_cache = {}
+    for (r_idx, c_idx), key_label in cell_to_key_map.items():
+        if not key_label: continue
+        size_pt = label_font_size(cell_width, cell_height, key_label, style["FONT_SIZE_BEHAVIOR"], style["FONT_FIXED_SIZE"])
+        font = _load_font(style["FONT_FAMILY"], style["FONT_WEIGHT"], max(1, round(size_pt * POINTS_TO_PIXELS)), font_cache)
+        center = ((c_idx + 0.5) * cell_width, (r_idx + 0.5) * cell_height)
+        draw.text(center, key_label, fill=style["TEXT_COLOR"], font=font, anchor="mm")
+    return image
+
+def remove_stale_bitmaps(keep_keys):
+    """Deletes the cached main grid PNGs (and leftover temporary files) whose key is not in `keep_keys`."""
+    directory = get_cache_dir(BITMAP_CACHE_SUBDIR)
+    keep = {os.path.join(directory, f"main_grid_{key}.png") for key in keep_keys}
+    for path in glob.glob(os.path.join(directory, "main_grid_*.png")) + glob.glob(os.path.join(directory, "main_grid_*.tmp")):
+        if path in keep or path.endswith(f".{os.getpid()}.tmp"): continue
+        try:
+            os.remove(path)
+        except OSError: # E.g. still open in another process on Windows; the next render retries
+            pass
+
+def load_or_render_grid_bitmap(screen_width, screen_height, cols, rows, key_map, style, live_args=()):
+    """
+    Returns (png_path, from_cache). Renders and stores the PNG on a cache miss;
+    on a hit Pillow is not even imported. After a render, PNGs other than this one
+    and those of `live_args` (this function's other argument tuples in use, e.g.
+    one per monitor) are deleted.
+    """
+    cache_key = bitmap_cache_key(screen_width, screen_height, cols, rows, key_map, style)
+    png_path = os.path.join(get_cache_dir(BITMAP_CACHE_SUBDIR), f"main_grid_{cache_key}.png")
+    if os.path.exists(png_path):
+        return png_path, True
+    cell_to_key_map = {v: k for k, v in key_map.items()}
+    image = render_grid_bitmap(screen_width, screen_height, cols, rows, cell_to_key_map, style)
+    tmp_path = f"{png_path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, png_path) # Atomic, so a concurrent launch never sees a half-written file
+    remove_stale_bitmaps({cache_key, *(bitmap_cache_key(*args) for args in live_args)})
+    return png_path, False
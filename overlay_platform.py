@@ -0,0 +1,169 @@
+# overlay_platform.py
+
+# --- Platform-specific Overlay Window Helpers ---
+# Tk has no portable way to make a window ignore the pointer or to hand keyboard
+# focus back to another application, so these talk to the window system
+# directly through ctypes. Every helper is best-effort: it returns False (or
+# None) when the platform is not supported and the caller keeps working.
+import ctypes
+import ctypes.util
+import sys
+
+# --- Windows ---
+GWL_EXSTYLE = -20
+WS_EX_TRANSPARENT = 0x00000020
+WS_EX_LAYERED = 0x00080000
+
+# --- X11 (XShape extension) ---
+SHAPE_SET = 0
+SHAPE_INPUT = 2
+UNSORTED = 0
+
+_x11 = None # (libX11, libXext, Display*) once opened, False if unavailable
+_win32 = None # (user32, shcore or None) once loaded, False if unavailable
+
+def _toplevel_handle(window):
+    """HWND / X window id of the toplevel's outer frame (the one the window system sees)."""
+    window.update_idletasks()
+    return int(window.wm_frame(), 16)
+
+def _open_x11():
+    global _x11
+    if _x11 is None:
+        _x11 = False
+        try:
+            xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+            xext = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Xext") or "libXext.so.6")
+            xlib.XOpenDisplay.restype = ctypes.c_void_p
+            xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+            xlib.XFlush.argtypes = [ctypes.c_void_p]
+            xlib.XGetInputFocus.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int)]
+            xlib.XSetInputFocus.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_ulong]
+            xext.XShapeCombineRectangles.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+                                                     ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+            xext.XShapeCombineMask.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+                                               ctypes.c_int, ctypes.c_ulong, ctypes.c_int]
+            display = xlib.XOpenDisplay(None)
+            if display: _x11 = (xlib, xext, display)
+        except (OSError, AttributeError) as e:
+            print(f"WARNING: X11 overlay helpers unavailable: {e}")
+    return _x11
+
+def _open_win32():
+    """
+    Private WinDLL instances with the prototypes below, so they do not leak into
+    ctypes.windll. Handles are pointer-sized: with the default int prototypes
+    ctypes would truncate them on 64-bit Windows.
+    """
+    global _win32
+    if _win32 is None:
+        _win32 = False
+        try:
+            from ctypes import wintypes
+            LONG_PTR = ctypes.c_ssize_t
+            user32 = ctypes.WinDLL("user32")
+            # GetWindowLongPtrW only exists in 64-bit user32; 32-bit headers map it to GetWindowLongW.
+            user32.get_window_long = getattr(user32, "GetWindowLongPtrW", None) or user32.GetWindowLongW
+            user32.set_window_long = getattr(user32, "SetWindowLongPtrW", None) or user32.SetWindowLongW
+            user32.get_window_long.argtypes = [wintypes.HWND, ctypes.c_int]
+            user32.get_window_long.restype = LONG_PTR
+            user32.set_window_long.argtypes = [wintypes.HWND, ctypes.c_int, LONG_PTR]
+            user32.set_window_long.restype = LONG_PTR
+            user32.GetForegroundWindow.argtypes = []
+            user32.GetForegroundWindow.restype = wintypes.HWND
+            user32.SetForegroundWindow.argtypes = [wintypes.HWND]
+            user32.SetForegroundWindow.restype = wintypes.BOOL
+            user32.MonitorFromPoint.argtypes = [wintypes.POINT, wintypes.DWORD]
+            user32.MonitorFromPoint.restype = wintypes.HMONITOR
+            user32.SetProcessDPIAware.restype = wintypes.BOOL
+            try:
+                shcore = ctypes.WinDLL("shcore") # Windows 8.1+
+                shcore.SetProcessDpiAwareness.argtypes = [ctypes.c_int]
+                shcore.SetProcessDpiAwareness.restype = ctypes.c_long # HRESULT
+                shcore.GetDpiForMonitor.argtypes = [wintypes.HMONITOR, ctypes.c_int, ctypes.POINTER(wintypes.UINT), ctypes.POINTER(wintypes.UINT)]
+                shcore.GetDpiForMonitor.restype = ctypes.c_long # HRESULT
+            except (OSError, AttributeError):
+                shcore = None
+            _win32 = (user32, shcore)
+        except (OSError, AttributeError) as e:
+            print(f"WARNING: Windows overlay helpers unavailable: {e}")
+    return _win32
+
+def set_click_through(window, enabled):
+    """
+    Lets pointer events pass through `window` to whatever is below it (or stops
+    doing so). Returns True if the platform supports it.
+    """
+    if sys.platform == "win32":
+        win32 = _open_win32()
+        if not win32: return False
+        user32 = win32[0]
+        hwnd = _toplevel_handle(window)
+        style = user32.get_window_long(hwnd, GWL_EXSTYLE)
+        style = (style | WS_EX_TRANSPARENT | WS_EX_LAYERED) if enabled else (style & ~WS_EX_TRANSPARENT)
+        user32.set_window_long(hwnd, GWL_EXSTYLE, style)
+        return True
+    if window._windowingsystem == "x11":
+        x11 = _open_x11()
+        if not x11: return False
+        xlib, xext, display = x11
+        xid = _toplevel_handle(window)
+        if enabled: xext.XShapeCombineRectangles(display, xid, SHAPE_INPUT, 0, 0, None, 0, SHAPE_SET, UNSORTED) # Empty input shape
+        else: xext.XShapeCombineMask(display, xid, SHAPE_INPUT, 0, 0, 0, SHAPE_SET) # None mask = default input shape
+        xlib.XFlush(display)
+        return True
+    return False
+
+def get_focused_window(window):
+    """Opaque handle of the window that currently has keyboard focus, or None."""
+    if sys.platform == "win32":
+        win32 = _open_win32()
+        return (win32[0].GetForegroundWindow() or None) if win32 else None
+    if window._windowingsystem == "x11":
+        x11 = _open_x11()
+        if not x11: return None
+        xlib, _, display = x11
+        focus, revert_to = ctypes.c_ulong(), ctypes.c_int()
+        xlib.XGetInputFocus(display, ctypes.byref(focus), ctypes.byref(revert_to))
+        return focus.value or None
+    return None
+
+def restore_focused_window(window, handle):
+    """Gives keyboard focus back to a handle from get_focused_window()."""
+    if not handle: return False
+    if sys.platform == "win32":
+        win32 = _open_win32()
+        return bool(win32 and win32[0].SetForegroundWindow(handle))
+    if window._windowingsystem == "x11":
+        x11 = _open_x11()
+        if not x11: return False
+        xlib, _, display = x11
+        xlib.XSetInputFocus(display, handle, 2, 0) # RevertToParent, CurrentTime
+        xlib.XFlush(display)
+        return True
+    return False
+
+def enable_dpi_awareness():
+    """
+    Asks Windows for per-monitor DPI awareness, so window geometry and pointer
+    coordinates are physical pixels on every monitor instead of being scaled to
+    the primary monitor's DPI. Must run before any window is created.
+    """
+    if sys.platform != "win32": return False
+    win32 = _open_win32()
+    if not win32: return False
+    user32, shcore = win32
+    if shcore: return shcore.SetProcessDpiAwareness(2) == 0 # PROCESS_PER_MONITOR_DPI_AWARE
+    return bool(user32.SetProcessDPIAware()) # Before Windows 8.1: system DPI awareness only
+
+def monitor_dpi(x, y):
+    """Effective DPI of the monitor containing the point (Windows 8.1+), or None."""
+    if sys.platform != "win32": return None
+    win32 = _open_win32()
+    if not win32 or not win32[1]: return None
+    from ctypes import wintypes
+    user32, shcore = win32
+    hmonitor = user32.MonitorFromPoint(wintypes.POINT(int(x), int(y)), 2) # MONITOR_DEFAULTTONEAREST
+    dpi_x, dpi_y = wintypes.UINT(), wintypes.UINT()
+    if shcore.GetDpiForMonitor(hmonitor, 0, ctypes.byref(dpi_x), ctypes.byref(dpi_y)) != 0: return None # MDT_EFFECTIVE_DPI
+    return dpi_x.value
@@ -0,0 +1,212 @@
+# pointer_backend.py
+
+# --- Pointer Injection Backends ---
+# Every pyautogui mouse call sleeps pyautogui.PAUSE (0.1 s by default) afterwards
+# and runs the fail-safe corner check first, which caps Free Mode at about ten
+# moves per second. These backends inject moves, clicks and scrolls directly:
+#   "sendinput" -- Windows, user32 SendInput/SetCursorPos through ctypes
+#   "xtest"     -- Linux/X11, the XTEST extension through python-xlib (what pyautogui uses there)
+#   "pyautogui" -- the previous path, kept as the portable fallback
+# All backends share one interface: position(), move_to(), move_relative(),
+# click(), scroll() and hscroll(). Scroll amounts are raw platform wheel units,
+# like pyautogui's: 120 per notch on Windows, one button press per unit on X11
+# (see `wheel_units_per_notch`).
+#
+# position() is called from the keyboard hook and control channel threads while
+# the action executor injects on its own; XTestPointer's python-xlib Display is
+# not thread-safe, so its requests are serialized by a lock. (SendInput and
+# GetCursorPos are safe from any thread.)
+import os
+import sys
+import threading
+
+POINTER_BACKEND_NAMES = ("auto", "sendinput", "xtest", "pyautogui")
+
+class PyAutoGuiPointer:
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+        self.wheel_units_per_notch = 120 if sys.platform == "win32" else 1
+
+    def position(self):
+        return tuple(self._pyautogui.position())
+
+    def move_to(self, x, y):
+        self._pyautogui.moveTo(x, y)
+
+    def move_relative(self, dx, dy):
+        self._pyautogui.move(dx, dy)
+
+    def click(self, x, y, button="left", clicks=1):
+        self._pyautogui.click(x=x, y=y, button=button, clicks=clicks)
+
+    def scroll(self, amount):
+        self._pyautogui.scroll(amount)
+
+    def hscroll(self, amount):
+        self._pyautogui.hscroll(amount)
+
+
+class XTestPointer:
+    name = "xtest"
+    wheel_units_per_notch = 1 # X11 wheels are buttons 4/5 (vertical) and 6/7 (horizontal)
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+    def __init__(self):
+        from Xlib import X
+        from Xlib.display import Display
+        from Xlib.ext.xtest import fake_input
+        self._X, self._fake_input = X, fake_input
+        self._display = Display(os.environ.get("DISPLAY"))
+        if not self._display.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+        self._root = self._display.screen().root
+        self._lock = threading.Lock() # One request stream: see above
+
+    def position(self):
+        with self._lock:
+            pointer = self._root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def move_to(self, x, y):
+        with self._lock:
+            self._fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+            self._display.flush()
+
+    def move_relative(self, dx, dy):
+        with self._lock:
+            self._fake_input(self._display, self._X.MotionNotify, detail=True, x=int(dx), y=int(dy)) # detail=True: relative motion
+            self._display.flush()
+
+    def _press_release(self, button, count):
+        for _ in range(count):
+            self._fake_input(self._display, self._X.ButtonPress, button)
+            self._fake_input(self._display, self._X.ButtonRelease, button)
+
+    def click(self, x, y, button="left", clicks=1):
+        with self._lock:
+            self._fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+            self._press_release(self.BUTTONS[button], clicks)
+            self._display.flush()
+
+    def scroll(self, amount):
+        with self._lock:
+            if amount: self._press_release(4 if amount > 0 else 5, abs(int(amount)))
+            self._display.flush()
+
+    def hscroll(self, amount):
+        with self._lock:
+            if amount: self._press_release(7 if amount > 0 else 6, abs(int(amount)))
+            self._display.flush()
+
+
+class SendInputPointer:
+    name = "sendinput"
+    wheel_units_per_notch = 120 # WHEEL_DELTA; smaller amounts are high-resolution wheel deltas
+    INPUT_MOUSE = 0
+    MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP = 0x0002, 0x0004
+    MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP = 0x0008, 0x0010
+    MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP = 0x0020, 0x0040
+    MOUSEEVENTF_WHEEL, MOUSEEVENTF_HWHEEL = 0x0800, 0x1000
+    BUTTONS = {"left": (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP),
+               "middle": (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP),
+               "right": (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP)}
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.LONG),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class INPUT(ctypes.Structure):
+            # The real INPUT holds a union of MOUSEINPUT/KEYBDINPUT/HARDWAREINPUT; MOUSEINPUT is the largest.
+            _fields_ = [("type", wintypes.DWORD), ("mi", MOUSEINPUT)]
+
+        self._ctypes, self._INPUT = ctypes, INPUT
+        self._user32 = ctypes.WinDLL("user32") # Own instance: these prototypes do not leak into ctypes.windll
+        self._user32.SendInput.argtypes = [wintypes.UINT, ctypes.c_void_p, ctypes.c_int]
+        self._user32.SendInput.restype = wintypes.UINT
+        self._user32.GetCursorPos.argtypes = [ctypes.POINTER(wintypes.POINT)]
+        self._user32.SetCursorPos.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._POINT = wintypes.POINT
+
+    def _send(self, *events):
+        """Sends (flags, mouse_data) events in a single SendInput call."""
+        inputs = (self._INPUT * len(events))()
+        for item, (flags, mouse_data) in zip(inputs, events):
+            item.type = self.INPUT_MOUSE
+            item.mi.dwFlags, item.mi.mouseData = flags, mouse_data
+        self._user32.SendInput(len(events), inputs, self._ctypes.sizeof(self._INPUT))
+
+    def position(self):
+        point = self._POINT() # Per call: position() runs on several threads
+        self._user32.GetCursorPos(self._ctypes.byref(point))
+        return point.x, point.y
+
+    def move_to(self, x, y):
+        self._user32.SetCursorPos(int(x), int(y))
+
+    def move_relative(self, dx, dy):
+        # SetCursorPos instead of a relative MOUSEEVENTF_MOVE, which Windows would run through pointer acceleration.
+        x, y = self.position()
+        self._user32.SetCursorPos(x + int(dx), y + int(dy))
+
+    def click(self, x, y, button="left", clicks=1):
+        self._user32.SetCursorPos(int(x), int(y))
+        down, up = self.BUTTONS[button]
+        self._send(*[(flag, 0) for _ in range(clicks) for flag in (down, up)])
+
+    def scroll(self, amount):
+        if amount: self._send((self.MOUSEEVENTF_WHEEL, int(amount)))
+
+    def hscroll(self, amount):
+        if amount: self._send((self.MOUSEEVENTF_HWHEEL, int(amount)))
+
+
+POINTER_BACKENDS = {"sendinput": SendInputPointer, "xtest": XTestPointer, "pyautogui": PyAutoGuiPointer}
+
+def get_pointer_backend(name="auto"):
+    """
+    Creates the requested backend. "auto" picks SendInput on Windows, XTest on X11
+    and pyautogui elsewhere; any backend that fails to initialize falls back to pyautogui.
+    """
+    if name == "auto":
+        if sys.platform == "win32": name = "sendinput"
+        elif os.environ.get("DISPLAY") and sys.platform != "darwin": name = "xtest"
+        else: name = "pyautogui"
+    if name not in POINTER_BACKENDS:
+        print(f"WARNING: Unknown POINTER_BACKEND '{name}'. Using pyautogui.")
+        name = "pyautogui"
+    try:
+        return POINTER_BACKENDS[name]()
+    except Exception as e:
+        if name == "pyautogui": raise
+        print(f"WARNING: Pointer backend '{name}' unavailable ({e}). Falling back to pyautogui.")
+        return PyAutoGuiPointer()
+
+
+if __name__ == "__main__":
+    # Microbenchmark: relative pointer moves per second for each usable backend.
+    # The pointer jiggles by one pixel back and forth, so it ends where it started.
+    # Usage: python pointer_backend.py [moves]
+    import time
+
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"--- Pointer injection benchmark ({moves} relative moves per backend) ---")
+    for backend_name in ("sendinput", "xtest", "pyautogui"):
+        try:
+            backend = POINTER_BACKENDS[backend_name]()
+        except Exception as e:
+            print(f"  {backend_name:<10}: unavailable ({e})")
+            continue
+        # pyautogui sleeps PAUSE after every call; cap its run so the benchmark stays short.
+        count = min(moves, 20) if backend_name == "pyautogui" else moves
+        start = time.perf_counter()
+        for i in range(count):
+            backend.move_relative(1 if i % 2 == 0 else -1, 0)
+        elapsed = time.perf_counter() - start
+        print(f"  {backend_name:<10}: {count / elapsed:10.1f} injections/s ({elapsed / count * 1e6:8.1f} us each, {count} moves)")
@@ -0,0 +1,85 @@
+# startup_profile.py
+
+# --- Startup Phase Timing ---
+# The app starts at login, often on slow machines, so cold start is measured in
+# phases (imports, key maps, monitors and layouts, windows, hooks, tray) and
+# checked against an optional budget. Times are wall-clock from the moment this
+# module is imported, which main_script.py does first; interpreter start-up
+# itself is not included.
+#
+# `python startup_profile.py` is the regression check: it cold-starts the app
+# in fresh processes with --startup-check, which exits right after start-up, and
+# fails when the median exceeds the budget.
+import time
+
+class StartupProfile:
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.phases = [] # (phase, seconds) in order
+
+    def mark(self, phase):
+        """Ends `phase`: records the time since the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total_ms(self):
+        return (self.last - self.started) * 1000
+
+    def over_budget(self, budget_ms):
+        return bool(budget_ms) and self.total_ms() > budget_ms
+
+    def format_report(self, budget_ms=0):
+        lines = ["--- Startup phases ---"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<20} {seconds * 1000:8.1f} ms")
+        verdict = ""
+        if budget_ms: verdict = f" (budget {budget_ms} ms: {'EXCEEDED' if self.over_budget(budget_ms) else 'ok'})"
+        lines.append(f"  {'total':<20} {self.total_ms():8.1f} ms{verdict}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Cold-start regression check and import breakdown.
+    # Usage: python startup_profile.py [budget_ms] [runs]
+    # budget_ms defaults to STARTUP_BUDGET_MS from feature_config.py; exits 1 if the median run exceeds it.
+    import os
+    import re
+    import statistics
+    import subprocess
+    import sys
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    if len(sys.argv) > 1: budget_ms = float(sys.argv[1])
+    else:
+        try: from feature_config import STARTUP_BUDGET_MS as budget_ms
+        except ImportError: budget_ms = 1000 # feature_config.py's default
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Heaviest modules main_script imports directly (cumulative microseconds, from -X importtime).
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main_script"],
+                            cwd=here, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if match and len(match.group(2)) == 3: # One level below main_script (each level indents by two)
+            imports.append((int(match.group(1)), match.group(3)))
+    print("--- Heaviest direct imports of main_script ---")
+    for microseconds, module in sorted(imports, reverse=True)[:10]:
+        print(f"  {module:<28} {microseconds / 1000:8.1f} ms")
+
+    totals = []
+    for run in range(runs):
+        result = subprocess.run([sys.executable, "main_script.py", "--startup-check", "--startup-budget", "0"],
+                                cwd=here, capture_output=True, text=True)
+        match = re.search(r"^  total\s+([\d.]+) ms", result.stdout, re.MULTILINE)
+        if result.returncode != 0 or not match:
+            print(result.stdout[-2000:], result.stderr[-2000:], sep="\n")
+            sys.exit(f"Start-up run {run + 1} failed (exit status {result.returncode}).")
+        totals.append(float(match.group(1)))
+        if run == 0: print(result.stdout[result.stdout.index("--- Startup phases ---"):].split("\n\n")[0])
+    median_ms = statistics.median(totals)
+    print(f"Cold start over {runs} runs: median {median_ms:.1f} ms (runs: {', '.join(f'{t:.1f}' for t in totals)})")
+    if budget_ms and median_ms > budget_ms:
+        sys.exit(f"FAIL: median cold start {median_ms:.1f} ms exceeds the budget of {budget_ms} ms.")
+    print(f"OK: within the budget of {budget_ms} ms." if budget_ms else "No budget set (STARTUP_BUDGET_MS = 0).")
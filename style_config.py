@@ -7,12 +7,12 @@ OVERLAY_BACKGROUND_COLOR = "black" # The color of the overlay window/canvas back
 # --- Grid Appearance ---
 GRID_COLOR = "white"
 GRID_LINE_WIDTH = 1 # Thickness of grid lines in pixels
-GRID_LINE_STYLE = "line" # "line", "dashes", "dots" (Note: "dots" might not be directly supported by tkinter create_line options, "dashes" is)
-                        # For "dots", we might need custom drawing or very short dashes.
-                        # Tkinter create_rectangle `outline` doesn't directly support dash styles.
-                        # We can use `dash` option for `create_line` if we draw lines instead of rects,
-                        # or for `create_rectangle` outline if on newer Tk versions/platforms.
-                        # Let's assume `create_rectangle` with a solid line for now, or handle `dash` if available.
+GRID_LINE_STYLE = "line" # "line", "dashes", "dots"
+                        # The grid is drawn as rows+1 horizontal and cols+1 vertical lines
+                        # (see grid_render.py), so every style maps to a `dash` pattern of create_line.
+GRID_RENDER_MODE = "canvas" # "canvas" draws lines and labels as Tk canvas items.
+                            # "bitmap" rasterizes the labelled main grid once with Pillow, caches the PNG
+                            # in the user cache dir (see overlay_bitmap.py) and shows it as a single image.
 SUB_GRID_HIGHLIGHT_COLOR = "lime"
 SUB_GRID_HIGHLIGHT_WIDTH = 3
 
@@ -26,6 +26,13 @@ FONT_FIXED_SIZE = 10 # Used if FONT_SIZE_BEHAVIOR is "fixed"
 # FONT_WEIGHT = "normal" # "normal" or "bold"
 FONT_WEIGHT = "normal"
 
+# --- Label Filtering ---
+# After the first key of a main-grid combo, labels that cannot match any more are dimmed
+# (or hidden) so only the candidates for the second key stand out.
+LABEL_FILTER_BEHAVIOR = "dim" # "dim", "hide" or "off" (not applied in GRID_RENDER_MODE = "bitmap")
+LABEL_FILTER_DIM_COLOR = "gray30" # Text color of non-matching labels when dimming
+LABEL_FILTER_MATCH_COLOR = "yellow" # Text color of the remaining candidate labels
+
 # --- Double Click ---
 DOUBLE_CLICK_INTERVAL = 0.35 # Seconds
 
@@ -43,12 +50,18 @@ def validate_configs():
     if not (0.0 <= OVERLAY_ALPHA <= 1.0):
         print("STYLE_CONFIG WARNING: OVERLAY_ALPHA should be between 0.0 and 1.0.")
         valid = False
-    if GRID_LINE_STYLE not in ["line", "dashes"]: # "dots" is harder with create_rectangle
+    if GRID_LINE_STYLE not in ["line", "dashes", "dots"]:
         print(f"STYLE_CONFIG WARNING: GRID_LINE_STYLE '{GRID_LINE_STYLE}' may not be fully supported. Using 'line'.")
         # You might choose to default GRID_LINE_STYLE = "line" here if invalid
+    if GRID_RENDER_MODE not in ["canvas", "bitmap"]:
+        print("STYLE_CONFIG WARNING: GRID_RENDER_MODE should be 'canvas' or 'bitmap'.")
+        valid = False
     if FONT_SIZE_BEHAVIOR not in ["dynamic", "fixed"]:
         print("STYLE_CONFIG WARNING: FONT_SIZE_BEHAVIOR should be 'dynamic' or 'fixed'.")
         valid = False
+    if LABEL_FILTER_BEHAVIOR not in ["dim", "hide", "off"]:
+        print("STYLE_CONFIG WARNING: LABEL_FILTER_BEHAVIOR should be 'dim', 'hide' or 'off'.")
+        valid = False
     if not (0.1 <= DOUBLE_CLICK_INTERVAL <= 1.0):
         print("STYLE_CONFIG WARNING: DOUBLE_CLICK_INTERVAL seems unusual. Recommended 0.2-0.5s.")
         # This is more of a soft warning
@@ -66,6 +79,7 @@ if __name__ == "__main__":
     print(f"Grid Color: {GRID_COLOR}")
     print(f"Grid Line Width: {GRID_LINE_WIDTH}")
     print(f"Grid Line Style: {GRID_LINE_STYLE}")
+    print(f"Grid Render Mode: {GRID_RENDER_MODE}")
     print(f"Sub-grid Highlight Color: {SUB_GRID_HIGHLIGHT_COLOR}")
     print(f"Sub-grid Highlight Width: {SUB_GRID_HIGHLIGHT_WIDTH}")
     print(f"Text Color: {TEXT_COLOR}")
@@ -73,5 +87,6 @@ if __name__ == "__main__":
     print(f"Font Size Behavior: {FONT_SIZE_BEHAVIOR}")
     print(f"Font Fixed Size: {FONT_FIXED_SIZE}")
     print(f"Font Weight: {FONT_WEIGHT}")
+    print(f"Label Filter: {LABEL_FILTER_BEHAVIOR} (dim: {LABEL_FILTER_DIM_COLOR}, match: {LABEL_FILTER_MATCH_COLOR})")
     print(f"Double Click Interval: {DOUBLE_CLICK_INTERVAL}")
     print(f"Left Alt Key Name: {LEFT_ALT_KEY_NAME}")
\ No newline at end of file
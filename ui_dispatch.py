@@ -0,0 +1,76 @@
+# ui_dispatch.py
+
+# --- UI Command Channel ---
+# Tk may only be driven from the thread running its mainloop. The keyboard hook,
+# the tray icon and other worker threads therefore never touch Tk: they post
+# named render commands here, and the Tk thread drains the channel once per
+# frame. Commands that supersede each other share a coalescing slot, so a burst
+# of keystrokes inside one frame produces at most one redraw.
+#
+# The drain runs every frame even when nothing was posted: a posting thread
+# cannot wake the Tk thread without calling into Tk, so a slower idle poll would
+# be added to the overlay toggle's latency. An empty frame is one deque check.
+from collections import deque
+
+class UiCommandChannel:
+    """
+    handlers -- command name -> callable(*args), run on the Tk thread
+    slots    -- command name -> slot name; a later command replaces any earlier one in its slot
+    resets   -- slot name -> slots it clears (e.g. a new scene drops a pending label filter)
+    Commands without a slot run once per distinct (name, args) per frame.
+    """
+
+    def __init__(self, handlers, slots=None, resets=None, interval_ms=16):
+        self.handlers = handlers
+        self.slots = slots or {}
+        self.resets = resets or {}
+        self.interval_ms = interval_ms
+        self._pending = deque() # deque.append/popleft are atomic, so posting needs no lock
+        self._root = None
+        self.frames = 0
+        self.posted = 0
+        self.executed = 0
+
+    def post(self, name, *args):
+        """Queues a command. Safe to call from any thread; never calls into Tk."""
+        self._pending.append((name, args))
+        self.posted += 1
+
+    def attach(self, root):
+        """Starts draining on `root`'s Tk thread. Call again after the root is recreated."""
+        self._root = root
+        root.after(self.interval_ms, self._drain)
+
+    def coalesce(self, commands):
+        """Reduces one frame's commands to the ones whose effect is still visible, in order."""
+        latest = {}
+        for name, args in commands:
+            slot = self.slots.get(name)
+            key = slot if slot else (name, args)
+            latest.pop(key, None) # Re-insert so the dict keeps the order of the latest occurrences
+            for reset_slot in self.resets.get(slot, ()):
+                latest.pop(reset_slot, None)
+            latest[key] = (name, args)
+        return list(latest.values())
+
+    def drain(self):
+        """Runs everything posted so far (coalesced). Must be called on the Tk thread."""
+        commands = []
+        while self._pending:
+            commands.append(self._pending.popleft())
+        if not commands: return
+        for name, args in self.coalesce(commands):
+            try:
+                self.handlers[name](*args)
+            except Exception as e:
+                print(f"ERROR: UI command '{name}' failed: {e}")
+            self.executed += 1
+
+    def _drain(self):
+        root = self._root
+        self.drain()
+        self.frames += 1
+        # A handler may have destroyed the root (or attached a new one); only reschedule on the live one.
+        if root is self._root:
+            try: root.after(self.interval_ms, self._drain)
+            except Exception: pass # Root destroyed during shutdown